@@ -1,22 +1,34 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Query
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import os
+import sys
+import hashlib
+import asyncio
 import numpy as np
 from dotenv import load_dotenv
-from qdrant_client import QdrantClient
-import tempfile
-import librosa
+from qdrant_client import AsyncQdrantClient, models as qdrant_models
+import io
+from pathlib import Path
+from collections import OrderedDict
+import soundfile as sf
 from PIL import Image
 import torch
 import torch.nn as nn
+import torchaudio
 from torchvision import models, transforms
-from openai import OpenAI
+from openai import AsyncOpenAI
 import pickle
-from transformers import Wav2Vec2Processor, Wav2Vec2Model
+import orjson
+from transformers import Wav2Vec2Model
+
+try:
+    import intel_extension_for_pytorch as ipex
+except ImportError:
+    ipex = None
 
 # Load environment variables
 load_dotenv()
@@ -24,7 +36,8 @@ load_dotenv()
 app = FastAPI(
     title="Multi-Modal Bird Search API",
     description="Search for birds using audio, images, or text descriptions with comprehensive results",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Enable CORS for frontend communication
@@ -39,20 +52,35 @@ app.add_middleware(
 # Mount static files for audio only (images use Wikimedia URLs)
 app.mount("/audio", StaticFiles(directory="../clips_10sec"), name="audio")
 
-# Initialize clients
-qdrant_client = QdrantClient(
+# Initialize clients (async over gRPC: cache loading runs concurrent scrolls and the
+# handlers await Qdrant without blocking the event loop)
+async_qdrant_client = AsyncQdrantClient(
     url=os.getenv('QDRANT_ENDPOINT'),
     api_key=os.getenv('QDRANT_API_KEY'),
+    prefer_grpc=True,
+    grpc_port=6334,
+    timeout=30,
 )
 
-openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+# HNSW search parameters shared by all vector searches
+SEARCH_PARAMS = qdrant_models.SearchParams(hnsw_ef=64, exact=False)
+
+openai_client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+# Split CPU cores between uvicorn workers so intra-op threads don't oversubscribe
+WORKERS = int(os.getenv('WEB_CONCURRENCY', '1'))
+torch.set_num_threads(max(1, (os.cpu_count() or 1) // WORKERS))
 
 # Initialize image model (ResNet50)
 device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+if device.type == 'cuda':
+    # Input shapes are fixed (224x224), so let cuDNN autotune once; allow TF32 matmuls
+    torch.backends.cudnn.benchmark = True
+    torch.set_float32_matmul_precision("high")
 image_model = models.resnet50(pretrained=True)
 image_model = nn.Sequential(*list(image_model.children())[:-1])
 image_model.eval()
-image_model.to(device)
+image_model.to(device, memory_format=torch.channels_last)
 
 # Image preprocessing
 image_transform = transforms.Compose([
@@ -62,83 +90,478 @@ image_transform = transforms.Compose([
     transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
 ])
 
-processor = Wav2Vec2Processor.from_pretrained("facebook/wav2vec2-base")
 model = Wav2Vec2Model.from_pretrained("facebook/wav2vec2-base")
+model.eval()
 
-# Audio feature extraction
-def extract_audio_features(audio_path: str) -> np.ndarray:
-    audio, sr = librosa.load(audio_path, sr=16000)
-    inputs = processor(audio, sampling_rate=16000, return_tensors="pt")
+# Opt-in INT8 quantization for CPU inference (QUANTIZE_MODELS=true). Off by default:
+# INT8 query embeddings drift from the FP32 vectors stored in Qdrant
+QUANTIZE_MODELS = os.getenv('QUANTIZE_MODELS', 'false').lower() == 'true'
+QUANTIZED_IMAGE_MODEL_PATH = "resnet50_int8.pt"
+CALIBRATION_IMAGE_DIR = os.getenv('CALIBRATION_IMAGE_DIR', str(Path(__file__).resolve().parent.parent / "bird_images_wikimedia"))
+CALIBRATION_IMAGE_COUNT = 100
+
+def quantize_image_model(fp32_model: nn.Module):
+    """Statically quantize ResNet50 to INT8, calibrated on the scraped bird images"""
+    if os.path.exists(QUANTIZED_IMAGE_MODEL_PATH):
+        return torch.jit.load(QUANTIZED_IMAGE_MODEL_PATH)
+    
+    calibration_dir = Path(CALIBRATION_IMAGE_DIR)
+    image_paths = sorted(calibration_dir.glob("*.jpg"))[:CALIBRATION_IMAGE_COUNT] if calibration_dir.is_dir() else []
+    if not image_paths:
+        print(f"No calibration images found in {CALIBRATION_IMAGE_DIR}, keeping FP32 image model")
+        return None
+    
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+    
+    example_input = torch.randn(1, 3, 224, 224).to(memory_format=torch.channels_last)
+    prepared = prepare_fx(fp32_model, get_default_qconfig_mapping('x86'), example_inputs=(example_input,))
     with torch.no_grad():
-        outputs = model(**inputs)
-        features = torch.mean(outputs.last_hidden_state, dim=1).squeeze().numpy()
-    return features
+        for image_path in image_paths:
+            image = Image.open(image_path).convert('RGB')
+            prepared(image_transform(image).unsqueeze(0).to(memory_format=torch.channels_last))
+        quantized = torch.jit.freeze(torch.jit.trace(convert_fx(prepared), example_input))
+    
+    torch.jit.save(quantized, QUANTIZED_IMAGE_MODEL_PATH)
+    print(f"Saved quantized image model to {QUANTIZED_IMAGE_MODEL_PATH}")
+    return quantized
 
-def get_all_text_data():
-    """Get all text data from collection"""
+# CPU inference optimizations: INT8 quantization when opted in, otherwise IPEX
+# operator fusion when installed; ResNet50 always ends up as a frozen TorchScript
+# graph so conv/bn/relu are folded
+quantized_image_model = None
+if device.type == 'cpu' and QUANTIZE_MODELS:
+    quantized_image_model = quantize_image_model(image_model)
+    model = torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+elif device.type == 'cpu' and ipex is not None:
+    image_model = ipex.optimize(image_model)
+    model = ipex.optimize(model)
+
+if quantized_image_model is not None:
+    image_model = quantized_image_model
+else:
+    with torch.no_grad():
+        example_input = torch.randn(1, 3, 224, 224, device=device).to(memory_format=torch.channels_last)
+        image_model = torch.jit.freeze(torch.jit.trace(image_model, example_input))
+
+# Audio feature extraction
+def load_audio(audio_file) -> torch.Tensor:
+    """Decode an audio file (path or file object) to a mono 16kHz waveform (Wav2Vec2 requirement)"""
     try:
-        results = qdrant_client.scroll(
-            collection_name="bird_text_search",
-            limit=100,
+        audio, sr = sf.read(audio_file, dtype='float32', always_2d=True)
+        waveform = torch.from_numpy(audio.mean(axis=1))
+    except sf.LibsndfileError:
+        # libsndfile can't decode webm/m4a/aac/mp4 (browser recordings); fall back to ffmpeg
+        if hasattr(audio_file, 'seek'):
+            audio_file.seek(0)
+        audio, sr = torchaudio.load(audio_file)
+        waveform = audio.mean(dim=0)
+    if sr != 16000:
+        waveform = torchaudio.functional.resample(waveform, sr, 16000)
+    return waveform
+
+def normalize_waveform(waveform: torch.Tensor) -> torch.Tensor:
+    """Zero-mean / unit-variance normalization, as done by the Wav2Vec2 feature extractor"""
+    return (waveform - waveform.mean()) / torch.sqrt(waveform.var(unbiased=False) + 1e-7)
+
+def extract_audio_features_batch(waveforms: List[torch.Tensor]) -> List[np.ndarray]:
+    """Run Wav2Vec2 on a batch of waveforms, mean-pooling each clip over its frames"""
+    # Wav2Vec2-base takes no attention mask and GroupNorms its first conv layer over time,
+    # so zero padding would change every frame. Only clips of identical length share a
+    # forward pass; every embedding matches a single-clip run
+    by_length = {}
+    for i, waveform in enumerate(waveforms):
+        by_length.setdefault(len(waveform), []).append(i)
+    
+    features = [None] * len(waveforms)
+    with torch.inference_mode():
+        for indices in by_length.values():
+            batch = torch.stack([normalize_waveform(waveforms[i]) for i in indices])
+            pooled = model(batch).last_hidden_state.mean(dim=1)
+            for i, row in zip(indices, pooled.to(torch.float32).cpu().numpy()):
+                features[i] = row
+    return features
+
+# Image feature extraction
+def preprocess_image(content: bytes) -> torch.Tensor:
+    """Decode uploaded image bytes into a normalized ResNet50 input tensor"""
+    image = Image.open(io.BytesIO(content)).convert('RGB')
+    return image_transform(image)
+
+def extract_image_features_batch(image_tensors: List[torch.Tensor]) -> List[np.ndarray]:
+    """Run ResNet50 on a batch of preprocessed image tensors"""
+    batch = torch.stack(image_tensors).to(device, memory_format=torch.channels_last)
+    with torch.inference_mode():
+        if image_graph is not None and batch.size(0) == 1:
+            # Single images replay the captured CUDA graph (no per-kernel launch overhead)
+            static_image_input.copy_(batch)
+            image_graph.replay()
+            features = static_image_output.clone()
+        else:
+            features = image_model(batch)
+        features = features.view(features.size(0), -1).cpu().numpy()
+    return list(features)
+
+# Warm-up so the first real request doesn't pay for lazy init / cuDNN autotuning
+WARMUP_ITERATIONS = 3
+
+def warm_up_models():
+    """Run dummy forward passes through both models"""
+    for _ in range(WARMUP_ITERATIONS):
+        extract_image_features_batch([torch.zeros(3, 224, 224)])
+        extract_audio_features_batch([torch.zeros(16000)])
+
+def capture_image_graph():
+    """Capture a CUDA graph of the fixed-shape (1x3x224x224) ResNet50 forward pass"""
+    static_input = torch.zeros(1, 3, 224, 224, device=device).to(memory_format=torch.channels_last)
+    
+    # CUDA graphs must be captured after warm-up iterations on a side stream
+    stream = torch.cuda.Stream()
+    stream.wait_stream(torch.cuda.current_stream())
+    with torch.cuda.stream(stream), torch.no_grad():
+        for _ in range(WARMUP_ITERATIONS):
+            image_model(static_input)
+    torch.cuda.current_stream().wait_stream(stream)
+    
+    graph = torch.cuda.CUDAGraph()
+    with torch.no_grad(), torch.cuda.graph(graph):
+        static_output = image_model(static_input)
+    return graph, static_input, static_output
+
+image_graph, static_image_input, static_image_output = None, None, None
+# Nothing in this service trains, so autograd is switched off once models are built
+# (grad mode is thread-local; the batched forward passes also use inference_mode)
+torch.set_grad_enabled(False)
+
+warm_up_models()
+if device.type == 'cuda':
+    image_graph, static_image_input, static_image_output = capture_image_graph()
+
+# Dynamic batching: concurrent requests arriving within BATCH_WAIT_SECONDS
+# are coalesced into a single forward pass of up to MAX_BATCH_SIZE items
+MAX_BATCH_SIZE = 16
+BATCH_WAIT_SECONDS = 0.010
+
+class InferenceBatcher:
+    """Coalesce concurrent inference requests into batched forward passes"""
+
+    def __init__(self, batch_fn):
+        self.batch_fn = batch_fn
+        self.queue = None
+        self.worker = None
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        self.worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.worker:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((item, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + BATCH_WAIT_SECONDS
+            while len(batch) < MAX_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Run the forward pass in a worker thread so the event loop stays responsive
+            try:
+                outputs = await asyncio.to_thread(self.batch_fn, [item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), output in zip(batch, outputs):
+                if not future.done():
+                    future.set_result(output)
+
+image_batcher = InferenceBatcher(extract_image_features_batch)
+audio_batcher = InferenceBatcher(extract_audio_features_batch)
+
+@app.on_event("startup")
+async def start_batchers():
+    image_batcher.start()
+    audio_batcher.start()
+
+@app.on_event("shutdown")
+async def stop_batchers():
+    await image_batcher.stop()
+    await audio_batcher.stop()
+
+# Text embedding (LRU-cached so repeated queries skip the OpenAI round-trip)
+EMBEDDING_CACHE_SIZE = 2048
+embedding_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+async def embed_text(query: str) -> np.ndarray:
+    embedding = embedding_cache.get(query)
+    if embedding is not None:
+        embedding_cache.move_to_end(query)
+        return embedding
+    
+    response = await openai_client.embeddings.create(
+        model="text-embedding-3-small",
+        input=query
+    )
+    # Stored as a read-only float32 array since the same object is shared by every cache hit
+    embedding = np.asarray(response.data[0].embedding, dtype=np.float32)
+    embedding.setflags(write=False)
+    
+    embedding_cache[query] = embedding
+    if len(embedding_cache) > EMBEDDING_CACHE_SIZE:
+        embedding_cache.popitem(last=False)
+    return embedding
+
+SCROLL_BATCH_SIZE = 1024
+
+# Payload strings repeated across many points (one copy each in memory)
+INTERNED_FIELDS = ("species_name", "scientific_name", "family")
+
+def intern_fields(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Intern repeated string fields so equal values share one object"""
+    for key in INTERNED_FIELDS:
+        value = payload.get(key)
+        if isinstance(value, str):
+            payload[key] = sys.intern(value)
+    return payload
+
+# Image/audio payloads are stored column-wise per bird ({field: [value, ...]})
+# so thousands of small per-point dicts aren't kept alive; MISSING marks a
+# field that a point's payload didn't have
+MISSING = object()
+
+def to_columns(payloads: List[Dict[str, Any]]) -> Dict[str, list]:
+    """Convert a list of payload dicts into one dict of parallel field lists"""
+    fields = dict.fromkeys(key for payload in payloads for key in payload)
+    return {field: [payload.get(field, MISSING) for payload in payloads] for field in fields}
+
+def media_rows(columns: Dict[str, list]) -> List[Dict[str, Any]]:
+    """Materialize column-wise media back into a list of payload dicts"""
+    fields = list(columns)
+    return [
+        {field: value for field, value in zip(fields, values) if value is not MISSING}
+        for values in zip(*columns.values())
+    ]
+
+async def scroll_all_points(collection_name: str) -> list:
+    """Scroll every point's payload from a collection, following page offsets"""
+    points = []
+    offset = None
+    while True:
+        batch, offset = await async_qdrant_client.scroll(
+            collection_name=collection_name,
+            limit=SCROLL_BATCH_SIZE,
+            offset=offset,
             with_payload=True,
             with_vectors=False
         )
-        return {point.payload.get("bird_id"): point.payload for point in results[0]}
+        points.extend(batch)
+        if offset is None:
+            return points
+
+async def get_all_text_data():
+    """Get all text data from collection"""
+    try:
+        points = await scroll_all_points("bird_text_search")
+        return {point.payload.get("bird_id"): intern_fields(point.payload) for point in points}
     except Exception as e:
         print(f"Error getting all text data: {e}")
         return {}
 
-def get_all_image_data():
+async def get_all_image_data():
     """Get all image data from collection"""
     try:
-        results = qdrant_client.scroll(
-            collection_name="bird_image_search",
-            limit=1000,
-            with_payload=True,
-            with_vectors=False
-        )
+        points = await scroll_all_points("bird_image_search")
         image_data = {}
-        for point in results[0]:
+        for point in points:
             bird_id = point.payload.get("bird_id")
             if bird_id not in image_data:
                 image_data[bird_id] = []
-            image_data[bird_id].append(point.payload)
-        return image_data
+            image_data[bird_id].append(intern_fields(point.payload))
+        return {bird_id: to_columns(payloads) for bird_id, payloads in image_data.items()}
     except Exception as e:
         print(f"Error getting all image data: {e}")
         return {}
 
-def get_all_audio_data():
+async def get_all_audio_data():
     """Get all audio data from collection"""
     try:
-        results = qdrant_client.scroll(
-            collection_name="bird_audio_search",
-            limit=1000,
-            with_payload=True,
-            with_vectors=False
-        )
+        points = await scroll_all_points("bird_audio_search")
         audio_data = {}
-        for point in results[0]:
+        for point in points:
             bird_id = point.payload.get("bird_id")
             if bird_id not in audio_data:
                 audio_data[bird_id] = []
-            # Add audio URL
-            payload = point.payload.copy()
+            # Add audio URL (scroll returns a fresh payload dict, so update it in place)
+            payload = point.payload
             if payload.get("clip_path"):
-                filename = payload["clip_path"].split("\\")[-1].split("/")[-1]
+                filename = os.path.basename(payload["clip_path"].replace("\\", "/"))
                 payload["audio_url"] = f"http://localhost:8000/audio/{filename}"
-            audio_data[bird_id].append(payload)
-        return audio_data
+            audio_data[bird_id].append(intern_fields(payload))
+        return {bird_id: to_columns(payloads) for bird_id, payloads in audio_data.items()}
     except Exception as e:
         print(f"Error getting all audio data: {e}")
         return {}
 
-# Cache data on startup
-print("Loading all data into memory...")
-ALL_TEXT_DATA = get_all_text_data()
-ALL_IMAGE_DATA = get_all_image_data()
-ALL_AUDIO_DATA = get_all_audio_data()
-print(f"Loaded {len(ALL_TEXT_DATA)} text records, {len(ALL_IMAGE_DATA)} image groups, {len(ALL_AUDIO_DATA)} audio groups")
+def wikipedia_url(text_info: Dict[str, Any]) -> str:
+    """Build the Wikipedia URL for a bird's text record"""
+    species_name = text_info.get("species_name")
+    return f"https://en.wikipedia.org/wiki/{species_name.replace(' ', '_')}" if species_name else ""
+
+def build_lookup_tables():
+    """Precompute per-bird primary media and Wikipedia URLs from cached data"""
+    primary_images = {bird_id: media_rows(columns)[0] for bird_id, columns in ALL_IMAGE_DATA.items() if columns}
+    primary_audio = {bird_id: media_rows(columns)[0] for bird_id, columns in ALL_AUDIO_DATA.items() if columns}
+    wiki_urls = {bird_id: wikipedia_url(text_info) for bird_id, text_info in ALL_TEXT_DATA.items()}
+    return primary_images, primary_audio, wiki_urls
+
+# Search results embed each bird's media lists as pre-serialized JSON fragments
+EMPTY_MEDIA_JSON = orjson.Fragment(b"[]")
+
+def build_media_json():
+    """Pre-serialize each bird's image and audio lists for search responses"""
+    image_json = {bird_id: orjson.Fragment(orjson.dumps(media_rows(columns)))
+                  for bird_id, columns in ALL_IMAGE_DATA.items()}
+    audio_json = {bird_id: orjson.Fragment(orjson.dumps(media_rows(columns)))
+                  for bird_id, columns in ALL_AUDIO_DATA.items()}
+    return image_json, audio_json
+
+def build_bird_record(bird_id, text_info: Dict[str, Any]) -> Dict[str, Any]:
+    """Build a /birds/all record using cached data"""
+    images = media_rows(ALL_IMAGE_DATA.get(bird_id, {}))
+    audio_clips = media_rows(ALL_AUDIO_DATA.get(bird_id, {}))
+    
+    return {
+        "bird_id": bird_id,
+        "species_name": text_info.get("species_name", "Unknown"),
+        "scientific_name": text_info.get("scientific_name", ""),
+        "family": text_info.get("family", ""),
+        
+        # Raw text information
+        "text_description": text_info.get("searchable_text", ""),
+        "raw_text_data": text_info,
+        
+        # Basic fields
+        "size": text_info.get("size", ""),
+        "url": WIKI_URLS.get(bird_id, ""),
+        
+        # Media data
+        "images": images,
+        "primary_image": PRIMARY_IMAGE_DATA.get(bird_id),
+        "audio_clips": audio_clips,
+        "primary_audio": PRIMARY_AUDIO_DATA.get(bird_id)
+    }
+
+def build_bird_info(bird_id) -> Dict[str, Any]:
+    """Build a /bird/{bird_id} response using cached data"""
+    text_info = ALL_TEXT_DATA.get(bird_id, {})
+    images = media_rows(ALL_IMAGE_DATA.get(bird_id, {}))
+    audio_clips = media_rows(ALL_AUDIO_DATA.get(bird_id, {}))
+    
+    return {
+        "bird_id": bird_id,
+        "species_name": text_info.get("species_name", "Unknown"),
+        "scientific_name": text_info.get("scientific_name", ""),
+        "family": text_info.get("family", ""),
+        "text_information": text_info,
+        "raw_text_data": text_info,
+        "images": images,
+        "audio_clips": audio_clips,
+        "counts": {
+            "images": len(images),
+            "audio_clips": len(audio_clips)
+        }
+    }
+
+def build_json_cache():
+    """Pre-serialize the read-only bird endpoints so requests just send bytes"""
+    all_birds = [build_bird_record(bird_id, text_info) for bird_id, text_info in ALL_TEXT_DATA.items()]
+    all_birds_json = orjson.dumps({
+        "results": all_birds,
+        "total_found": len(all_birds),
+        "search_type": "all_records"
+    })
+    
+    bird_ids = set(ALL_TEXT_DATA) | set(ALL_IMAGE_DATA) | set(ALL_AUDIO_DATA)
+    bird_json = {
+        bird_id: orjson.dumps(build_bird_info(bird_id))
+        for bird_id in bird_ids if bird_id is not None
+    }
+    
+    # ETag covering every cached body, so any content change invalidates clients' copies
+    digest = hashlib.sha1(all_birds_json)
+    for bird_id in sorted(bird_json):
+        digest.update(bird_json[bird_id])
+    return all_birds_json, bird_json, f'"{digest.hexdigest()}"'
+
+# HTTP caching for read endpoints: clients revalidate with If-None-Match after max-age
+CACHE_CONTROL = "public, max-age=60"
+
+def etag_json_response(request: Request, content: bytes, etag: str = None) -> Response:
+    """Return JSON bytes with ETag/Cache-Control headers, or 304 if the client's copy is current"""
+    if etag is None:
+        etag = f'"{hashlib.sha1(content).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+async def load_all_data():
+    """Load all three collections into the in-memory cache concurrently"""
+    global ALL_TEXT_DATA, ALL_IMAGE_DATA, ALL_AUDIO_DATA, ALL_BIRDS_JSON, BIRD_JSON_CACHE, CACHE_ETAG
+    global PRIMARY_IMAGE_DATA, PRIMARY_AUDIO_DATA, WIKI_URLS, IMAGE_JSON, AUDIO_JSON
+    ALL_TEXT_DATA, ALL_IMAGE_DATA, ALL_AUDIO_DATA = await asyncio.gather(
+        get_all_text_data(),
+        get_all_image_data(),
+        get_all_audio_data()
+    )
+    PRIMARY_IMAGE_DATA, PRIMARY_AUDIO_DATA, WIKI_URLS = build_lookup_tables()
+    IMAGE_JSON, AUDIO_JSON = build_media_json()
+    ALL_BIRDS_JSON, BIRD_JSON_CACHE, CACHE_ETAG = build_json_cache()
+
+# Cached data (populated on startup)
+ALL_TEXT_DATA, ALL_IMAGE_DATA, ALL_AUDIO_DATA = {}, {}, {}
+PRIMARY_IMAGE_DATA, PRIMARY_AUDIO_DATA, WIKI_URLS = {}, {}, {}
+IMAGE_JSON, AUDIO_JSON = {}, {}
+ALL_BIRDS_JSON, BIRD_JSON_CACHE, CACHE_ETAG = b"", {}, '""'
+
+async def ensure_payload_indexes():
+    """Index bird_id on the image collection so group-by queries stay fast"""
+    try:
+        await async_qdrant_client.create_payload_index(
+            collection_name="bird_image_search",
+            field_name="bird_id",
+            field_schema=qdrant_models.PayloadSchemaType.INTEGER
+        )
+    except Exception as e:
+        print(f"Error creating bird_id payload index: {e}")
+
+@app.on_event("startup")
+async def load_cache():
+    await ensure_payload_indexes()
+    print("Loading all data into memory...")
+    await load_all_data()
+    print(f"Loaded {len(ALL_TEXT_DATA)} text records, {len(ALL_IMAGE_DATA)} image groups, {len(ALL_AUDIO_DATA)} audio groups")
 
 def create_comprehensive_result(search_result, search_type: str) -> Dict[str, Any]:
     """Create comprehensive result using cached data"""
@@ -146,10 +569,10 @@ def create_comprehensive_result(search_result, search_type: str) -> Dict[str, An
     if bird_id is None:
         return None
     
-    # Get data from cache
+    # Get data from cache (media lists are pre-serialized fragments)
     text_info = ALL_TEXT_DATA.get(bird_id, {})
-    images = ALL_IMAGE_DATA.get(bird_id, [])
-    audio_clips = ALL_AUDIO_DATA.get(bird_id, [])
+    images = IMAGE_JSON.get(bird_id, EMPTY_MEDIA_JSON)
+    audio_clips = AUDIO_JSON.get(bird_id, EMPTY_MEDIA_JSON)
     
     return {
         "bird_id": bird_id,
@@ -170,24 +593,50 @@ def create_comprehensive_result(search_result, search_type: str) -> Dict[str, An
         "ecology": "",
         "group_dynamics": "",
         "extract": "",
-        "url": f"https://en.wikipedia.org/wiki/{text_info.get('species_name', '').replace(' ', '_')}" if text_info.get("species_name") else "",
+        "url": WIKI_URLS.get(bird_id, ""),
         
         # Media data
         "images": images,
-        "primary_image": images[0] if images else None,
+        "primary_image": PRIMARY_IMAGE_DATA.get(bird_id),
         "audio_clips": audio_clips,
-        "primary_audio": audio_clips[0] if audio_clips else None
+        "primary_audio": PRIMARY_AUDIO_DATA.get(bird_id)
     }
 
+# Uploads are decoded in memory; reject anything larger than this
+MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+
+async def read_upload(file: UploadFile) -> bytes:
+    """Read an uploaded file into memory, enforcing MAX_UPLOAD_BYTES"""
+    content = await file.read(MAX_UPLOAD_BYTES + 1)
+    if len(content) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"File exceeds {MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit")
+    return content
+
 # Pydantic models
 class SearchRequest(BaseModel):
     query: str
     limit: int = 12
 
-class SearchResponse(BaseModel):
-    results: List[Dict[str, Any]]
-    total_found: int
-    search_type: str
+# Text search parses its body with orjson instead of validating SearchRequest;
+# the model is kept only to document the request body in the OpenAPI schema
+SEARCH_REQUEST_OPENAPI = {
+    "requestBody": {
+        "content": {"application/json": {"schema": SearchRequest.model_json_schema()}},
+        "required": True
+    }
+}
+
+async def parse_search_request(request: Request):
+    """Parse a {"query", "limit"} JSON body without Pydantic validation"""
+    try:
+        data = orjson.loads(await request.body())
+        query = data["query"]
+        limit = int(data.get("limit", 12))
+    except (orjson.JSONDecodeError, KeyError, TypeError, ValueError, AttributeError):
+        raise HTTPException(status_code=422, detail="Body must be JSON with a 'query' string and an optional integer 'limit'")
+    if not isinstance(query, str):
+        raise HTTPException(status_code=422, detail="'query' must be a string")
+    return query, limit
 
 # API Endpoints
 @app.get("/")
@@ -195,33 +644,33 @@ async def root():
     return {"message": "Multi-Modal Bird Search API", "status": "active"}
 
 @app.get("/collections/status")
-async def get_collections_status():
+async def get_collections_status(request: Request):
     try:
         collections = ["bird_audio_search", "bird_image_search", "bird_text_search"]
         status = {}
+        infos = await asyncio.gather(
+            *[async_qdrant_client.get_collection(c) for c in collections],
+            return_exceptions=True
+        )
         
-        for collection_name in collections:
-            try:
-                info = qdrant_client.get_collection(collection_name)
+        for collection_name, info in zip(collections, infos):
+            if isinstance(info, Exception):
+                status[collection_name] = {"status": "error", "error": str(info)}
+            else:
                 status[collection_name] = {
                     "status": "active",
                     "points_count": info.points_count,
                     "vector_size": info.config.params.vectors.size
                 }
-            except Exception as e:
-                status[collection_name] = {"status": "error", "error": str(e)}
         
-        return status
+        return etag_json_response(request, orjson.dumps(status))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error checking collections: {str(e)}")
 
 @app.get("/refresh-cache")
 async def refresh_cache():
     """Refresh cached data"""
-    global ALL_TEXT_DATA, ALL_IMAGE_DATA, ALL_AUDIO_DATA
-    ALL_TEXT_DATA = get_all_text_data()
-    ALL_IMAGE_DATA = get_all_image_data()
-    ALL_AUDIO_DATA = get_all_audio_data()
+    await load_all_data()
     return {
         "message": "Cache refreshed",
         "counts": {
@@ -231,23 +680,22 @@ async def refresh_cache():
         }
     }
 
-@app.post("/search/text")
-async def search_by_text(request: SearchRequest):
+@app.post("/search/text", response_model=None, openapi_extra=SEARCH_REQUEST_OPENAPI)
+async def search_by_text(request: Request):
     """Search birds by text description"""
     try:
-        # Generate embedding
-        response = openai_client.embeddings.create(
-            model="text-embedding-3-small",
-            input=request.query
-        )
-        query_vector = response.data[0].embedding
+        query, limit = await parse_search_request(request)
+        
+        # Generate embedding (normalized so equivalent queries share a cache entry)
+        query_vector = await embed_text(query.strip().lower())
         
         # Search in text collection
-        results = qdrant_client.search(
+        results = (await async_qdrant_client.query_points(
             collection_name="bird_text_search",
-            query_vector=query_vector,
-            limit=request.limit
-        )
+            query=query_vector,
+            limit=limit,
+            search_params=SEARCH_PARAMS
+        )).points
         
         # Create comprehensive results
         comprehensive_results = []
@@ -256,12 +704,14 @@ async def search_by_text(request: SearchRequest):
             if comprehensive_result:
                 comprehensive_results.append(comprehensive_result)
         
-        return SearchResponse(
-            results=comprehensive_results,
-            total_found=len(comprehensive_results),
-            search_type="text"
-        )
+        return ORJSONResponse({
+            "results": comprehensive_results,
+            "total_found": len(comprehensive_results),
+            "search_type": "text"
+        })
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Text search error: {str(e)}")
 
@@ -272,75 +722,68 @@ async def search_by_audio(file: UploadFile = File(...), limit: int = Query(12)):
         if not file.content_type.startswith('audio/'):
             raise HTTPException(status_code=400, detail="File must be an audio file")
         
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
-        
-        try:
-            # Extract audio features
-            features = extract_audio_features(tmp_file_path)
-            
-            # Search in audio collection
-            results = qdrant_client.search(
-                collection_name="bird_audio_search",
-                query_vector=features.tolist(),
-                limit=limit
-            )
-            
-            # Create comprehensive results
-            comprehensive_results = []
-            for result in results:
-                comprehensive_result = create_comprehensive_result(result, "audio")
-                if comprehensive_result:
-                    comprehensive_results.append(comprehensive_result)
-            
-            return SearchResponse(
-                results=comprehensive_results,
-                total_found=len(comprehensive_results),
-                search_type="audio"
-            )
-            
-        finally:
-            os.unlink(tmp_file_path)
-            
+        # Decode the upload in memory (off the event loop)
+        content = await read_upload(file)
+        waveform = await asyncio.to_thread(load_audio, io.BytesIO(content))
+        
+        # Extract audio features (batched with concurrent requests)
+        features = await audio_batcher.submit(waveform)
+        
+        # Search in audio collection
+        results = (await async_qdrant_client.query_points(
+            collection_name="bird_audio_search",
+            query=features.astype(np.float32, copy=False),
+            limit=limit,
+            search_params=SEARCH_PARAMS
+        )).points
+        
+        # Create comprehensive results
+        comprehensive_results = []
+        for result in results:
+            comprehensive_result = create_comprehensive_result(result, "audio")
+            if comprehensive_result:
+                comprehensive_results.append(comprehensive_result)
+        
+        return ORJSONResponse({
+            "results": comprehensive_results,
+            "total_found": len(comprehensive_results),
+            "search_type": "audio"
+        })
+        
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Audio search error: {str(e)}")
 
 @app.get("/bird/{bird_id}")
-async def get_bird_info(bird_id: int):
+async def get_bird_info(bird_id: int, request: Request):
     """Get comprehensive information about a specific bird"""
     try:
-        text_info = ALL_TEXT_DATA.get(bird_id, {})
-        images = ALL_IMAGE_DATA.get(bird_id, [])
-        audio_clips = ALL_AUDIO_DATA.get(bird_id, [])
+        bird_json = BIRD_JSON_CACHE.get(bird_id)
         
-        if not any([text_info, images, audio_clips]):
+        if bird_json is None:
             raise HTTPException(status_code=404, detail=f"Bird with ID {bird_id} not found")
         
-        return {
-            "bird_id": bird_id,
-            "species_name": text_info.get("species_name", "Unknown"),
-            "scientific_name": text_info.get("scientific_name", ""),
-            "family": text_info.get("family", ""),
-            "text_information": text_info,
-            "raw_text_data": text_info,
-            "images": images,
-            "audio_clips": audio_clips,
-            "counts": {
-                "images": len(images),
-                "audio_clips": len(audio_clips)
-            }
-        }
+        return etag_json_response(request, bird_json, CACHE_ETAG)
         
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving bird info: {str(e)}")
 
+async def stream_completion(stream):
+    """Relay chat completion tokens as Server-Sent Events"""
+    try:
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield b"data: " + orjson.dumps({"delta": chunk.choices[0].delta.content}) + b"\n\n"
+    except Exception as e:
+        yield b"data: " + orjson.dumps({"error": f"Error enhancing description: {str(e)}"}) + b"\n\n"
+    yield b"data: [DONE]\n\n"
+
 @app.post("/enhance-description")
-async def enhance_description(request: dict):
-    """Use LLM to enhance bird description"""
+async def enhance_description(request: dict, stream: bool = Query(False)):
+    """Use LLM to enhance bird description (?stream=true streams tokens as SSE)"""
     try:
         raw_text = request.get("raw_text_data", {})
         searchable_text = raw_text.get("searchable_text", "")
@@ -359,7 +802,16 @@ async def enhance_description(request: dict):
         Format as a readable paragraph for each section.
         """
         
-        response = openai_client.chat.completions.create(
+        if stream:
+            completion_stream = await openai_client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=2000,
+                stream=True
+            )
+            return StreamingResponse(stream_completion(completion_stream), media_type="text/event-stream")
+        
+        response = await openai_client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": prompt}],
             max_tokens=2000
@@ -386,21 +838,6 @@ async def get_database_stats():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting stats: {str(e)}")
 
-def get_unique_birds_from_results(results, search_type: str) -> List[Dict[str, Any]]:
-    """Get unique birds from search results, avoiding duplicates"""
-    seen_bird_ids = set()
-    unique_results = []
-    
-    for result in results:
-        bird_id = result.payload.get("bird_id")
-        if bird_id is not None and bird_id not in seen_bird_ids:
-            seen_bird_ids.add(bird_id)
-            comprehensive_result = create_comprehensive_result(result, search_type)
-            if comprehensive_result:
-                unique_results.append(comprehensive_result)
-    
-    return unique_results
-
 @app.post("/search/image")
 async def search_by_image(file: UploadFile = File(...), limit: int = Query(12)):
     """Search birds by uploaded image"""
@@ -408,90 +845,47 @@ async def search_by_image(file: UploadFile = File(...), limit: int = Query(12)):
         if not file.content_type.startswith('image/'):
             raise HTTPException(status_code=400, detail="File must be an image")
         
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
-        
-        try:
-            # Process image
-            image = Image.open(tmp_file_path).convert('RGB')
-            image_tensor = image_transform(image).unsqueeze(0).to(device)
-            
-            with torch.no_grad():
-                features = image_model(image_tensor)
-                features = features.view(features.size(0), -1).squeeze().cpu().numpy()
-            
-            # Search in image collection - get more results to account for duplicates
-            results = qdrant_client.search(
-                collection_name="bird_image_search",
-                query_vector=features.tolist(),
-                limit=limit * 5  # Get more since we'll deduplicate
-            )
-            
-            # Get unique birds only
-            comprehensive_results = get_unique_birds_from_results(results, "image")
-            
-            # Limit to requested amount
-            comprehensive_results = comprehensive_results[:limit]
-            
-            return SearchResponse(
-                results=comprehensive_results,
-                total_found=len(comprehensive_results),
-                search_type="image"
-            )
-            
-        finally:
-            os.unlink(tmp_file_path)
-            
+        # Process image (decoded in memory, off the event loop)
+        content = await read_upload(file)
+        image_tensor = await asyncio.to_thread(preprocess_image, content)
+        
+        # Extract features (batched with concurrent requests)
+        features = await image_batcher.submit(image_tensor)
+        
+        # Search in image collection, grouped server-side so each bird appears once
+        groups = (await async_qdrant_client.query_points_groups(
+            collection_name="bird_image_search",
+            query=features.astype(np.float32, copy=False),
+            group_by="bird_id",
+            group_size=1,
+            limit=limit,
+            search_params=SEARCH_PARAMS
+        )).groups
+        
+        # Create comprehensive results from the best hit of each bird
+        comprehensive_results = []
+        for group in groups:
+            comprehensive_result = create_comprehensive_result(group.hits[0], "image")
+            if comprehensive_result:
+                comprehensive_results.append(comprehensive_result)
+        
+        return ORJSONResponse({
+            "results": comprehensive_results,
+            "total_found": len(comprehensive_results),
+            "search_type": "image"
+        })
+        
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Image search error: {str(e)}")
     
 @app.get("/birds/all")
-async def get_all_birds():
+async def get_all_birds(request: Request):
     """Get all 88 bird records with comprehensive information"""
-    try:
-        all_birds = []
-        
-        # Iterate through all cached text data (which contains all 88 birds)
-        for bird_id, text_info in ALL_TEXT_DATA.items():
-            # Get associated media data
-            images = ALL_IMAGE_DATA.get(bird_id, [])
-            audio_clips = ALL_AUDIO_DATA.get(bird_id, [])
-            
-            # Create comprehensive result (same structure as search results)
-            bird_record = {
-                "bird_id": bird_id,
-                "species_name": text_info.get("species_name", "Unknown"),
-                "scientific_name": text_info.get("scientific_name", ""),
-                "family": text_info.get("family", ""),
-                
-                # Raw text information
-                "text_description": text_info.get("searchable_text", ""),
-                "raw_text_data": text_info,
-                
-                # Basic fields
-                "size": text_info.get("size", ""),
-                "url": f"https://en.wikipedia.org/wiki/{text_info.get('species_name', '').replace(' ', '_')}" if text_info.get("species_name") else "",
-                
-                # Media data
-                "images": images,
-                "primary_image": images[0] if images else None,
-                "audio_clips": audio_clips,
-                "primary_audio": audio_clips[0] if audio_clips else None
-            }
-            
-            all_birds.append(bird_record)
-        
-        return {
-            "results": all_birds,
-            "total_found": len(all_birds),
-            "search_type": "all_records"
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching all birds: {str(e)}")
-        
+    # Served from the pre-serialized cache built at load / refresh time
+    return etag_json_response(request, ALL_BIRDS_JSON, CACHE_ETAG)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -3,17 +3,25 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
+from collections import OrderedDict
+from pathlib import Path
 import os
+import io
+import asyncio
 import numpy as np
 from dotenv import load_dotenv
-from qdrant_client import QdrantClient
+from qdrant_client import QdrantClient, AsyncQdrantClient, models as qdrant_models
 import tempfile
-import librosa
+import shutil
+import soundfile as sf
 from PIL import Image
 import torch
 import torch.nn as nn
+import torchaudio
 from torchvision import models, transforms
-from openai import OpenAI
+from torchvision.io import decode_jpeg, ImageReadMode
+from torchvision.transforms import v2
+from openai import AsyncOpenAI
 import pickle
 from transformers import Wav2Vec2Processor, Wav2Vec2Model
 
@@ -36,19 +44,217 @@ app.add_middleware(
 )
 
 # Initialize clients
+# gRPC transport: vectors travel as protobuf floats instead of JSON
 qdrant_client = QdrantClient(
     url=os.getenv('QDRANT_ENDPOINT'),
     api_key=os.getenv('QDRANT_API_KEY'),
+    prefer_grpc=True,
+    grpc_port=6334,
 )
 
-openai_client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+# Async client for endpoints that fan out over all collections
+async_qdrant_client = AsyncQdrantClient(
+    url=os.getenv('QDRANT_ENDPOINT'),
+    api_key=os.getenv('QDRANT_API_KEY'),
+    prefer_grpc=True,
+    grpc_port=6334,
+)
+
+openai_client = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# Optional Matryoshka truncation of text embeddings (e.g. 512 instead of the full 1536).
+# The stored bird_text_search vectors are full size; truncated queries need a collection
+# re-indexed at the same size, set via TEXT_COLLECTION
+EMBEDDING_DIMENSIONS = int(os.getenv('EMBEDDING_DIMENSIONS', '0')) or None
+TEXT_COLLECTION = os.getenv('TEXT_COLLECTION', 'bird_text_search')
+
+# Text query embeddings, LRU-cached per query string so repeat queries skip the OpenAI call
+EMBEDDING_CACHE_SIZE = 4096
+embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+
+async def embed_text(query: str) -> List[float]:
+    embedding = embedding_cache.get(query)
+    if embedding is not None:
+        embedding_cache.move_to_end(query)
+        return embedding
+    
+    kwargs = {"dimensions": EMBEDDING_DIMENSIONS} if EMBEDDING_DIMENSIONS else {}
+    response = await openai_client.embeddings.create(model=EMBEDDING_MODEL, input=query, **kwargs)
+    embedding = response.data[0].embedding
+    
+    embedding_cache[query] = embedding
+    if len(embedding_cache) > EMBEDDING_CACHE_SIZE:
+        embedding_cache.popitem(last=False)
+    return embedding
+
+# Image backbone: "resnet50" (2048-d, matches the stored bird_image_search vectors) or
+# "mobilenet_v3_small" (576-d, far cheaper per image; needs a collection indexed with it)
+IMAGE_BACKBONE = os.getenv('IMAGE_BACKBONE', 'resnet50')
+IMAGE_COLLECTION = os.getenv('IMAGE_COLLECTION', 'bird_image_search')
+
+COLLECTIONS = ["bird_audio_search", IMAGE_COLLECTION, TEXT_COLLECTION]
+
+def search_params(limit: int) -> qdrant_models.SearchParams:
+    """Per-query search params: ef scaled to limit, int8 search with rescoring"""
+    return qdrant_models.SearchParams(
+        hnsw_ef=max(64, 4 * limit),
+        quantization=qdrant_models.QuantizationSearchParams(rescore=True, oversampling=2.0)
+    )
+
+def bird_filter(bird_id: int) -> qdrant_models.Filter:
+    """Filter matching all points of a single bird"""
+    return qdrant_models.Filter(
+        must=[qdrant_models.FieldCondition(key="bird_id", match=qdrant_models.MatchValue(value=bird_id))]
+    )
+
+def configure_hnsw_params(vector_count: int) -> Dict[str, int]:
+    """Pick HNSW graph parameters by collection size"""
+    if vector_count < 10_000:
+        return {"m": 16, "ef_construct": 128}
+    if vector_count < 1_000_000:
+        return {"m": 32, "ef_construct": 256}
+    return {"m": 48, "ef_construct": 512}
+
+def tune_hnsw():
+    """Apply size-appropriate HNSW parameters to all collections"""
+    for collection_name in COLLECTIONS:
+        try:
+            info = qdrant_client.get_collection(collection_name)
+            params = configure_hnsw_params(info.points_count or 0)
+            hnsw = info.config.hnsw_config
+            if hnsw.m == params["m"] and hnsw.ef_construct == params["ef_construct"]:
+                continue
+            qdrant_client.update_collection(
+                collection_name=collection_name,
+                hnsw_config=qdrant_models.HnswConfigDiff(**params)
+            )
+        except Exception as e:
+            print(f"Error tuning HNSW on {collection_name}: {e}")
+
+# Representative vector per (collection, bird_id), LRU-cached so cross-modal
+# queries skip the lookup round-trip after the first request for a bird
+VECTOR_CACHE_SIZE = 10000
+vector_cache: "OrderedDict[tuple, List[float]]" = OrderedDict()
+
+async def get_vector(collection_name: str, bird_id: int) -> Optional[List[float]]:
+    key = (collection_name, bird_id)
+    vector = vector_cache.get(key)
+    if vector is not None:
+        vector_cache.move_to_end(key)
+        return vector
+    
+    # Find the bird in this collection (vector only, payload not needed)
+    points = (await async_qdrant_client.query_points(
+        collection_name=collection_name,
+        query_filter=bird_filter(bird_id),
+        limit=1,
+        with_payload=False,
+        with_vectors=True
+    )).points
+    if not points:
+        return None
+    
+    vector = points[0].vector
+    vector_cache[key] = vector
+    if len(vector_cache) > VECTOR_CACHE_SIZE:
+        vector_cache.popitem(last=False)
+    return vector
+
+def ensure_payload_indexes():
+    """Index bird_id on all collections so bird_id filters don't scan every point"""
+    for collection_name in COLLECTIONS:
+        try:
+            qdrant_client.create_payload_index(
+                collection_name=collection_name,
+                field_name="bird_id",
+                field_schema=qdrant_models.PayloadSchemaType.INTEGER
+            )
+        except Exception as e:
+            print(f"Error creating bird_id payload index on {collection_name}: {e}")
+
+def keep_collections_in_ram():
+    """Keep vectors and HNSW graphs RAM-resident (the bird dataset easily fits)"""
+    for collection_name in COLLECTIONS:
+        try:
+            config = qdrant_client.get_collection(collection_name).config
+            
+            # Unnamed collections have a single VectorParams, named ones a dict of them
+            vectors = config.params.vectors
+            named_vectors = vectors if isinstance(vectors, dict) else {"": vectors}
+            on_disk_vectors = [name for name, params in named_vectors.items() if params.on_disk]
+            
+            update = {}
+            if on_disk_vectors:
+                update["vectors_config"] = {name: qdrant_models.VectorParamsDiff(on_disk=False) for name in on_disk_vectors}
+            if config.hnsw_config.on_disk:
+                update["hnsw_config"] = qdrant_models.HnswConfigDiff(on_disk=False)
+            if config.optimizer_config.memmap_threshold != 0:
+                # 0 disables memmapped segments, so nothing is served from the page cache
+                update["optimizers_config"] = qdrant_models.OptimizersConfigDiff(memmap_threshold=0)
+            
+            if update:
+                qdrant_client.update_collection(collection_name=collection_name, **update)
+        except Exception as e:
+            print(f"Error moving {collection_name} to RAM: {e}")
+
+SCALAR_QUANTIZATION = qdrant_models.ScalarQuantizationConfig(
+    type=qdrant_models.ScalarType.INT8,
+    quantile=0.99,
+    always_ram=True
+)
+
+def enable_scalar_quantization():
+    """Enable int8 scalar quantization (kept in RAM) on collections that don't have it yet"""
+    for collection_name in COLLECTIONS:
+        try:
+            current = qdrant_client.get_collection(collection_name).config.quantization_config
+            scalar = getattr(current, "scalar", None)
+            if (scalar is not None and scalar.type == SCALAR_QUANTIZATION.type
+                    and scalar.quantile == SCALAR_QUANTIZATION.quantile
+                    and scalar.always_ram == SCALAR_QUANTIZATION.always_ram):
+                continue
+            qdrant_client.update_collection(
+                collection_name=collection_name,
+                quantization_config=qdrant_models.ScalarQuantization(scalar=SCALAR_QUANTIZATION)
+            )
+        except Exception as e:
+            print(f"Error enabling quantization on {collection_name}: {e}")
+
+# Split CPU cores between uvicorn workers so intra-op threads don't oversubscribe.
+# A plain `uvicorn main_1:app` (or an importer) is one process and keeps every core;
+# `python main_1.py` sets WEB_CONCURRENCY for the workers it spawns
+WORKERS = int(os.getenv('WEB_CONCURRENCY', '1'))
+torch.set_num_threads(max(1, (os.cpu_count() or 1) // WORKERS))
 
-# Initialize image model (ResNet50)
 device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
-image_model = models.resnet50(pretrained=True)
-image_model = nn.Sequential(*list(image_model.children())[:-1])
-image_model.eval()
-image_model.to(device)
+
+# Models are built per worker process in the load_models startup hook rather than at
+# import, so the uvicorn supervisor never loads them or opens a CUDA context
+image_model = None
+processor, model = None, None
+audio_graph, static_audio_input, static_audio_output = None, None, None
+
+def build_image_model() -> nn.Module:
+    """ResNet50 or MobileNetV3-Small backbone, both ending in global average pooling"""
+    if IMAGE_BACKBONE == 'mobilenet_v3_small':
+        mobilenet = models.mobilenet_v3_small(weights=models.MobileNet_V3_Small_Weights.DEFAULT)
+        backbone = nn.Sequential(mobilenet.features, mobilenet.avgpool)
+    else:
+        resnet = models.resnet50(pretrained=True)
+        backbone = nn.Sequential(*list(resnet.children())[:-1])
+    backbone.eval()
+    # channels_last (NHWC) lets cuDNN pick tensor-core convolution kernels
+    backbone.to(device, memory_format=torch.channels_last)
+    
+    # Compile on GPU: fuses conv+bn+relu and replays the forward as a CUDA graph.
+    # On CPU the MobileNetV3 backbone runs INT8 (quantized kernels are CPU-only)
+    if device.type == 'cuda':
+        return torch.compile(backbone, mode="reduce-overhead", fullgraph=True)
+    if IMAGE_BACKBONE == 'mobilenet_v3_small':
+        return quantize_image_model(backbone)
+    return backbone
 
 # Image preprocessing
 image_transform = transforms.Compose([
@@ -58,22 +264,228 @@ image_transform = transforms.Compose([
     transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
 ])
 
-processor = Wav2Vec2Processor.from_pretrained("facebook/wav2vec2-base")
-model = Wav2Vec2Model.from_pretrained("facebook/wav2vec2-base")
+# GPU preprocessing for JPEG uploads: nvJPEG decode + the same steps as image_transform on tensors
+gpu_image_transform = nn.Sequential(
+    v2.Resize(256, antialias=True),
+    v2.CenterCrop(224),
+    v2.ToDtype(torch.float32, scale=True),
+    v2.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
+)
+
+def preprocess_image(content: bytes) -> torch.Tensor:
+    """Decode uploaded image bytes into a normalized backbone input tensor"""
+    if device.type == 'cuda' and content[:3] == b'\xff\xd8\xff':
+        raw = torch.frombuffer(bytearray(content), dtype=torch.uint8)
+        try:
+            image = decode_jpeg(raw, mode=ImageReadMode.RGB, device=device)
+            return gpu_image_transform(image)
+        except RuntimeError:
+            # nvJPEG rejects some JPEGs PIL handles (CMYK, progressive); fall back below
+            pass
+    
+    # Other formats (and CPU-only hosts) go through PIL, ending on the same device as the GPU path
+    image = Image.open(io.BytesIO(content)).convert('RGB')
+    return image_transform(image).to(device)
 
-# Audio feature extraction
-def extract_audio_features(audio_path: str) -> np.ndarray:
-    # Load audio at 16kHz (Wav2Vec2 requirement)
-    audio, sr = librosa.load(audio_path, sr=16000)
+CALIBRATION_IMAGE_DIR = "../bird_images_wikimedia"
+CALIBRATION_IMAGE_COUNT = 100
+
+def quantize_image_model(fp32_model: nn.Module) -> nn.Module:
+    """Statically quantize the image backbone to INT8, calibrated on the scraped bird images"""
+    image_paths = sorted(Path(CALIBRATION_IMAGE_DIR).glob("*.jpg"))[:CALIBRATION_IMAGE_COUNT]
+    if not image_paths:
+        print(f"No calibration images found in {CALIBRATION_IMAGE_DIR}, keeping FP32 image model")
+        return fp32_model
     
-    # Get wav2vec features
-    inputs = processor(audio, sampling_rate=16000, return_tensors="pt")
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+    
+    example_input = torch.randn(1, 3, 224, 224).to(memory_format=torch.channels_last)
+    prepared = prepare_fx(fp32_model, get_default_qconfig_mapping('x86'), example_inputs=(example_input,))
     with torch.no_grad():
-        outputs = model(**inputs)
-        features = torch.mean(outputs.last_hidden_state, dim=1).squeeze().numpy()
+        for image_path in image_paths:
+            image = Image.open(image_path).convert('RGB')
+            prepared(image_transform(image).unsqueeze(0).to(memory_format=torch.channels_last))
+    return convert_fx(prepared)
+
+# Mixed precision for Wav2Vec2 inference on GPU only (fp16). CPU inference stays fp32:
+# bf16 activations would drift the query embeddings away from the stored FP32 vectors
+audio_autocast_dtype = torch.float16
+audio_autocast_enabled = device.type == 'cuda'
+
+# Audio feature extraction
+def load_audio(audio_path: str) -> np.ndarray:
+    """Load audio as mono 16kHz (Wav2Vec2 requirement)"""
+    try:
+        audio, sr = sf.read(audio_path, dtype='float32', always_2d=True)
+        waveform = torch.from_numpy(audio.mean(axis=1))
+    except sf.LibsndfileError:
+        # libsndfile can't decode webm/m4a/aac/mp4 (browser recordings); fall back to ffmpeg
+        audio, sr = torchaudio.load(audio_path)
+        waveform = audio.mean(dim=0)
+    if sr != 16000:
+        waveform = torchaudio.functional.resample(waveform, sr, 16000)
+    return waveform.numpy()
+
+def extract_audio_features_batch(audios: List[np.ndarray]) -> List[List[float]]:
+    """Run Wav2Vec2 on a batch of clips, co-batching only clips of identical length"""
+    # Wav2Vec2-base takes no attention mask and its GroupNorm spans the time axis,
+    # so zero padding would change every frame of the shorter clips
+    by_length = {}
+    for i, audio in enumerate(audios):
+        by_length.setdefault(len(audio), []).append(i)
+    
+    features = [None] * len(audios)
+    for indices in by_length.values():
+        inputs = processor([audios[i] for i in indices], sampling_rate=16000, return_tensors="pt")
+        input_values = inputs["input_values"]
+        if audio_graph is not None and input_values.size(0) == 1 and input_values.size(1) == AUDIO_WINDOW_SAMPLES:
+            # A single clip of exactly the window length replays the captured CUDA graph;
+            # anything else runs eager, since padding would change the embedding
+            static_audio_input.copy_(input_values)
+            audio_graph.replay()
+            hidden = static_audio_output
+        else:
+            with torch.inference_mode(), torch.autocast(device_type=device.type, dtype=audio_autocast_dtype, enabled=audio_autocast_enabled):
+                hidden = model(input_values.to(device)).last_hidden_state
+        
+        # Pool in fp32 so the query vector matches the stored embeddings' precision;
+        # one tensor -> Python floats conversion per group
+        for i, row in zip(indices, hidden.float().mean(dim=1).cpu().tolist()):
+            features[i] = row
+    return features
+
+# CUDA graph of the Wav2Vec2 forward pass on a fixed-length window (the stored clips are 10 seconds)
+AUDIO_WINDOW_SAMPLES = 16000 * 10
+
+def capture_audio_graph():
+    """Capture a CUDA graph of Wav2Vec2 on a [1, AUDIO_WINDOW_SAMPLES] input"""
+    static_input = torch.zeros(1, AUDIO_WINDOW_SAMPLES, device=device)
+    # Autocast's weight-cast cache must be off while capturing
+    autocast = lambda: torch.autocast(device_type='cuda', dtype=audio_autocast_dtype, cache_enabled=False)
+    
+    # CUDA graphs must be captured after warm-up iterations on a side stream
+    stream = torch.cuda.Stream()
+    stream.wait_stream(torch.cuda.current_stream())
+    with torch.cuda.stream(stream), torch.inference_mode(), autocast():
+        for _ in range(3):
+            model(static_input)
+    torch.cuda.current_stream().wait_stream(stream)
+    
+    graph = torch.cuda.CUDAGraph()
+    with torch.inference_mode(), autocast(), torch.cuda.graph(graph):
+        static_output = model(static_input).last_hidden_state
+    return graph, static_input, static_output
+
+# Image feature extraction
+def extract_image_features_batch(image_tensors: List[torch.Tensor]) -> List[List[float]]:
+    """Run ResNet50 on a batch of preprocessed image tensors"""
+    # Tensors from different decode paths (or warm-up) may sit on different devices
+    batch = torch.stack([tensor.to(device) for tensor in image_tensors])
+    size = batch.size(0)
+    if device.type == 'cuda':
+        # Pad to a power of two so the compiled model only ever sees a few static shapes
+        bucket = 1 << (size - 1).bit_length()
+        batch = torch.cat([batch, batch.new_zeros(bucket - size, *batch.shape[1:])])
+    batch = batch.to(device, memory_format=torch.channels_last)
+    
+    with torch.inference_mode():
+        features = image_model(batch)
+        features = features[:size].flatten(1).cpu().tolist()
     
     return features
 
+# Dynamic batching: concurrent requests arriving within BATCH_WAIT_SECONDS
+# are coalesced into a single forward pass of up to MAX_BATCH_SIZE items
+MAX_BATCH_SIZE = 16
+BATCH_WAIT_SECONDS = 0.008
+
+class InferenceBatcher:
+    """Coalesce concurrent inference requests into batched forward passes"""
+
+    def __init__(self, batch_fn):
+        self.batch_fn = batch_fn
+        self.queue = None
+        self.worker = None
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        self.worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.worker:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((item, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + BATCH_WAIT_SECONDS
+            while len(batch) < MAX_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Run the forward pass in a worker thread so the event loop stays responsive
+            try:
+                outputs = await asyncio.to_thread(self.batch_fn, [item for item, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), output in zip(batch, outputs):
+                if not future.done():
+                    future.set_result(output)
+
+# Warm-up so the first real request doesn't pay for compilation / cuDNN autotuning
+def warm_up_image_model():
+    """Run a dummy batch through ResNet50 at every batch shape the batcher can produce"""
+    batch_sizes = [1 << i for i in range(MAX_BATCH_SIZE.bit_length())] if device.type == 'cuda' else [1]
+    for batch_size in batch_sizes:
+        extract_image_features_batch([torch.zeros(3, 224, 224)] * batch_size)
+
+image_batcher = InferenceBatcher(extract_image_features_batch)
+audio_batcher = InferenceBatcher(extract_audio_features_batch)
+
+@app.on_event("startup")
+async def load_models():
+    """Build the image and audio models in this worker process"""
+    global image_model, processor, model, audio_graph, static_audio_input, static_audio_output
+    image_model = build_image_model()
+    
+    processor = Wav2Vec2Processor.from_pretrained("facebook/wav2vec2-base")
+    model = Wav2Vec2Model.from_pretrained("facebook/wav2vec2-base")
+    model.to(device).eval()
+    if device.type == 'cuda':
+        audio_graph, static_audio_input, static_audio_output = capture_audio_graph()
+    
+    warm_up_image_model()
+
+@app.on_event("startup")
+async def start_batchers():
+    image_batcher.start()
+    audio_batcher.start()
+
+@app.on_event("shutdown")
+async def stop_batchers():
+    await image_batcher.stop()
+    await audio_batcher.stop()
+
 # Pydantic models
 class SearchRequest(BaseModel):
     query: str
@@ -91,6 +503,16 @@ class BirdInfo(BaseModel):
     family: Optional[str]
     confidence_score: float
 
+# Collection-level settings (payload indexes, RAM placement, quantization, HNSW) rewrite the
+# shared Qdrant config and trigger re-indexing, so they are applied once by an operator
+# (python main_1.py --configure-collections), not by every worker on startup
+def configure_collections():
+    """Apply collection-level search optimizations"""
+    ensure_payload_indexes()
+    keep_collections_in_ram()
+    enable_scalar_quantization()
+    tune_hnsw()
+
 # API Endpoints
 
 @app.get("/")
@@ -102,22 +524,24 @@ async def root():
 async def get_collections_status():
     """Get status of all Qdrant collections"""
     try:
-        collections = ["bird_audio_search", "bird_image_search", "bird_text_search"]
         status = {}
+        infos = await asyncio.gather(
+            *[async_qdrant_client.get_collection(c) for c in COLLECTIONS],
+            return_exceptions=True
+        )
         
-        for collection_name in collections:
-            try:
-                info = qdrant_client.get_collection(collection_name)
+        for collection_name, info in zip(COLLECTIONS, infos):
+            if isinstance(info, Exception):
+                status[collection_name] = {
+                    "status": "error",
+                    "error": str(info)
+                }
+            else:
                 status[collection_name] = {
                     "status": "active",
                     "points_count": info.points_count,
                     "vector_size": info.config.params.vectors.size
                 }
-            except Exception as e:
-                status[collection_name] = {
-                    "status": "error",
-                    "error": str(e)
-                }
         
         return status
     except Exception as e:
@@ -127,19 +551,16 @@ async def get_collections_status():
 async def search_by_text(request: SearchRequest):
     """Search birds by text description"""
     try:
-        # Generate embedding for the text query
-        response = openai_client.embeddings.create(
-            model="text-embedding-3-small",
-            input=request.query
-        )
-        query_vector = response.data[0].embedding
+        # Generate embedding for the text query (repeat queries hit the cache)
+        query_vector = await embed_text(request.query)
         
         # Search in Qdrant
-        results = qdrant_client.search(
-            collection_name="bird_text_search",
-            query_vector=query_vector,
-            limit=request.limit
-        )
+        results = (await async_qdrant_client.query_points(
+            collection_name=TEXT_COLLECTION,
+            query=query_vector,
+            limit=request.limit,
+            search_params=search_params(request.limit)
+        )).points
         
         # Format results
         formatted_results = []
@@ -171,56 +592,51 @@ async def search_by_image(file: UploadFile = File(...), limit: int = Query(10)):
         if not file.content_type.startswith('image/'):
             raise HTTPException(status_code=400, detail="File must be an image")
         
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
+        # Decode and preprocess straight from the upload bytes (on the GPU for JPEGs),
+        # off the event loop
+        content = await file.read()
+        image_tensor = await asyncio.to_thread(preprocess_image, content)
+        
+        # Extract features (batched with concurrent requests)
+        features = await image_batcher.submit(image_tensor)
+        
+        # Search in Qdrant
+        results = (await async_qdrant_client.query_points(
+            collection_name=IMAGE_COLLECTION,
+            query=features,
+            limit=limit,
+            search_params=search_params(limit)
+        )).points
+        
+        # Format results
+        formatted_results = []
+        for result in results:
+            formatted_results.append({
+                "bird_id": result.payload.get("bird_id"),
+                "species_name": result.payload.get("species_name"),
+                "image_path": result.payload.get("image_path"),
+                "source_url": result.payload.get("source_url"),
+                "quality_score": result.payload.get("quality_score"),
+                "confidence_score": float(result.score),
+                "width": result.payload.get("width"),
+                "height": result.payload.get("height")
+            })
+        
+        return SearchResponse(
+            results=formatted_results,
+            total_found=len(results),
+            search_type="image"
+        )
         
-        try:
-            # Load and preprocess image
-            image = Image.open(tmp_file_path).convert('RGB')
-            image_tensor = image_transform(image).unsqueeze(0).to(device)
-            
-            # Extract features
-            with torch.no_grad():
-                features = image_model(image_tensor)
-                features = features.view(features.size(0), -1).squeeze().cpu().numpy()
-            
-            # Search in Qdrant
-            results = qdrant_client.search(
-                collection_name="bird_image_search",
-                query_vector=features.tolist(),
-                limit=limit
-            )
-            
-            # Format results
-            formatted_results = []
-            for result in results:
-                formatted_results.append({
-                    "bird_id": result.payload.get("bird_id"),
-                    "species_name": result.payload.get("species_name"),
-                    "image_path": result.payload.get("image_path"),
-                    "source_url": result.payload.get("source_url"),
-                    "quality_score": result.payload.get("quality_score"),
-                    "confidence_score": float(result.score),
-                    "width": result.payload.get("width"),
-                    "height": result.payload.get("height")
-                })
-            
-            return SearchResponse(
-                results=formatted_results,
-                total_found=len(results),
-                search_type="image"
-            )
-            
-        finally:
-            # Clean up temporary file
-            os.unlink(tmp_file_path)
-            
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Image search error: {str(e)}")
 
+def save_upload(source, suffix: str) -> str:
+    """Copy an uploaded file to a named temporary file and return its path"""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+        shutil.copyfileobj(source, tmp_file, length=65536)
+        return tmp_file.name
+
 @app.post("/search/audio")
 async def search_by_audio(file: UploadFile = File(...), limit: int = Query(10)):
     """Search birds by uploaded audio file"""
@@ -229,22 +645,21 @@ async def search_by_audio(file: UploadFile = File(...), limit: int = Query(10)):
         if not file.content_type.startswith('audio/'):
             raise HTTPException(status_code=400, detail="File must be an audio file")
         
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
+        # Stream uploaded file to disk in 64KB chunks, off the event loop
+        tmp_file_path = await asyncio.to_thread(save_upload, file.file, os.path.splitext(file.filename or '')[1])
         
         try:
-            # Extract audio features
-            features = extract_audio_features(tmp_file_path)
+            # Decode off the event loop, then extract audio features (batched with concurrent requests)
+            waveform = await asyncio.to_thread(load_audio, tmp_file_path)
+            features = await audio_batcher.submit(waveform)
             
             # Search in Qdrant
-            results = qdrant_client.search(
+            results = (await async_qdrant_client.query_points(
                 collection_name="bird_audio_search",
-                query_vector=features.tolist(),
-                limit=limit
-            )
+                query=features,
+                limit=limit,
+                search_params=search_params(limit)
+            )).points
             
             # Format results
             formatted_results = []
@@ -278,49 +693,41 @@ async def cross_modal_search(bird_id: int, limit: int = Query(5)):
     try:
         results = {}
         
-        # Search in each collection by bird_id
-        collections = ["bird_audio_search", "bird_image_search", "bird_text_search"]
+        async def search_collection(collection_name):
+            target_vector = await get_vector(collection_name, bird_id)
+            if target_vector is None:
+                return None
+            
+            # Search for similar birds
+            similar_results = (await async_qdrant_client.query_points(
+                collection_name=collection_name,
+                query=target_vector,
+                limit=limit,
+                search_params=search_params(limit)
+            )).points
+            
+            return [
+                {
+                    "bird_id": result.payload.get("bird_id"),
+                    "species_name": result.payload.get("species_name"),
+                    "confidence_score": float(result.score),
+                    **result.payload  # Include all metadata
+                }
+                for result in similar_results
+            ]
+        
+        # Search each collection by bird_id concurrently
+        responses = await asyncio.gather(
+            *[search_collection(c) for c in COLLECTIONS],
+            return_exceptions=True
+        )
         
-        for collection_name in collections:
-            try:
-                # Find the bird in this collection
-                bird_results = qdrant_client.scroll(
-                    collection_name=collection_name,
-                    scroll_filter={
-                        "must": [
-                            {
-                                "key": "bird_id",
-                                "match": {"value": bird_id}
-                            }
-                        ]
-                    },
-                    limit=1
-                )
-                
-                if bird_results[0]:  # If bird found
-                    target_vector = bird_results[0][0].vector
-                    
-                    # Search for similar birds
-                    similar_results = qdrant_client.search(
-                        collection_name=collection_name,
-                        query_vector=target_vector,
-                        limit=limit
-                    )
-                    
-                    # Format results
-                    modality = collection_name.replace("bird_", "").replace("_search", "")
-                    results[modality] = []
-                    
-                    for result in similar_results:
-                        results[modality].append({
-                            "bird_id": result.payload.get("bird_id"),
-                            "species_name": result.payload.get("species_name"),
-                            "confidence_score": float(result.score),
-                            **result.payload  # Include all metadata
-                        })
-                        
-            except Exception as e:
-                results[collection_name] = {"error": str(e)}
+        for collection_name, response in zip(COLLECTIONS, responses):
+            if isinstance(response, Exception):
+                results[collection_name] = {"error": str(response)}
+            elif response is not None:
+                modality = collection_name.replace("bird_", "").replace("_search", "")
+                results[modality] = response
         
         return {
             "target_bird_id": bird_id,
@@ -336,31 +743,25 @@ async def get_bird_info(bird_id: int):
     try:
         bird_info = {}
         
-        collections = ["bird_audio_search", "bird_image_search", "bird_text_search"]
-        
-        for collection_name in collections:
-            try:
-                results = qdrant_client.scroll(
-                    collection_name=collection_name,
-                    scroll_filter={
-                        "must": [
-                            {
-                                "key": "bird_id", 
-                                "match": {"value": bird_id}
-                            }
-                        ]
-                    },
+        responses = await asyncio.gather(
+            *[
+                async_qdrant_client.query_points(
+                    collection_name=c,
+                    query_filter=bird_filter(bird_id),
                     limit=10  # Get all instances of this bird
                 )
-                
-                modality = collection_name.replace("bird_", "").replace("_search", "")
-                bird_info[modality] = []
-                
-                for point in results[0]:
-                    bird_info[modality].append(point.payload)
-                    
-            except Exception as e:
-                bird_info[collection_name] = {"error": str(e)}
+                for c in COLLECTIONS
+            ],
+            return_exceptions=True
+        )
+        
+        for collection_name, response in zip(COLLECTIONS, responses):
+            if isinstance(response, Exception):
+                bird_info[collection_name] = {"error": str(response)}
+                continue
+            
+            modality = collection_name.replace("bird_", "").replace("_search", "")
+            bird_info[modality] = [point.payload for point in response.points]
         
         if not any(bird_info.values()):
             raise HTTPException(status_code=404, detail=f"Bird with ID {bird_id} not found")
@@ -380,19 +781,22 @@ async def get_database_stats():
     """Get statistics about the bird database"""
     try:
         stats = {}
-        collections = ["bird_audio_search", "bird_image_search", "bird_text_search"]
+        infos = await asyncio.gather(
+            *[async_qdrant_client.get_collection(c) for c in COLLECTIONS],
+            return_exceptions=True
+        )
         
-        for collection_name in collections:
-            try:
-                info = qdrant_client.get_collection(collection_name)
-                modality = collection_name.replace("bird_", "").replace("_search", "")
-                stats[modality] = {
-                    "total_points": info.points_count,
-                    "vector_dimensions": info.config.params.vectors.size,
-                    "status": info.status
-                }
-            except Exception as e:
-                stats[collection_name] = {"error": str(e)}
+        for collection_name, info in zip(COLLECTIONS, infos):
+            if isinstance(info, Exception):
+                stats[collection_name] = {"error": str(info)}
+                continue
+            
+            modality = collection_name.replace("bird_", "").replace("_search", "")
+            stats[modality] = {
+                "total_points": info.points_count,
+                "vector_dimensions": info.config.params.vectors.size,
+                "status": info.status
+            }
         
         return {
             "database_stats": stats,
@@ -403,5 +807,18 @@ async def get_database_stats():
         raise HTTPException(status_code=500, detail=f"Error getting stats: {str(e)}")
 
 if __name__ == "__main__":
+    import argparse
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Bird Discovery search API")
+    parser.add_argument('--configure-collections', action='store_true', help="apply collection-level Qdrant optimizations once and exit")
+    cli_args = parser.parse_args()
+    if cli_args.configure_collections:
+        configure_collections()
+        raise SystemExit(0)
+    
+    # Workers inherit WEB_CONCURRENCY and size their torch thread pools from it. Each worker
+    # imports this module and builds its own models, CUDA graphs and clients at startup;
+    # loop="auto" uses uvloop when installed
+    workers = int(os.getenv('WEB_CONCURRENCY', '4'))
+    os.environ['WEB_CONCURRENCY'] = str(workers)
+    uvicorn.run("main_1:app", host="0.0.0.0", port=8000, workers=workers, loop="auto", http="httptools")
\ No newline at end of file
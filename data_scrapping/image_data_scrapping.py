@@ -4,27 +4,179 @@ Smart multi-agent system to find and download bird images from Wikimedia Commons
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
+import hashlib
+import diskcache
 import pickle
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import time
-from PIL import Image
+import random
+import asyncio
+import threading
+import os
 import io
+import shutil
+from PIL import Image
 from urllib.parse import unquote
+from concurrent.futures import ThreadPoolExecutor
 from crewai import Agent, Task, Crew
 
+# File extensions accepted as bird photos
+_IMG_EXTS = ('.jpg', '.jpeg', '.png')
+
+# Characters that are unsafe in filenames on common filesystems, mapped to '_'
+_SAFE_TBL = str.maketrans({c: '_' for c in ' /\\:?*"<>|'})
+
+# Stored images are downscaled to fit in this box (the embedding models use 224px inputs)
+MAX_IMAGE_DIM = 512
+
+# On-disk cache of successful API responses, so reruns don't repeat finished queries
+API_CACHE_DIR = '.wikimedia_cache'
+API_CACHE_TTL = 7 * 24 * 3600  # seconds
+
+# Global request budget towards Wikimedia (requests per second, shared by all threads)
+REQUESTS_PER_SECOND = 10
+
+class TokenBucket:
+    """Thread-safe token bucket: a sustained rate with short bursts up to capacity"""
+    
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a request may be sent"""
+        
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
 class WikimediaBirdImageCollector:
     """Intelligent bird image collection from Wikimedia Commons"""
     
-    def __init__(self):
+    def __init__(self, keep_original=False):
         self.base_url = "https://commons.wikimedia.org/w/api.php"
         self.output_dir = Path("bird_images_wikimedia")
         self.output_dir.mkdir(exist_ok=True)
         
+        # Store downloads untouched instead of downscaled to MAX_IMAGE_DIM
+        self.keep_original = keep_original
+        
+        # One pooled keep-alive session for the API and image hosts, behind a rate limiter
+        self.session = self._create_session()
+        self.limiter = TokenBucket(REQUESTS_PER_SECOND)
+        self.cache = diskcache.Cache(API_CACHE_DIR, size_limit=int(2e9))
+        
+        # Worker threads for overlapping image-info lookups and downloads
+        self.pool = ThreadPoolExecutor(max_workers=8)
+        
+        # Optional JSONL log of download records (see open_results_log)
+        self.results_log = None
+        self.results_lock = threading.Lock()
+        self.completed = set()  # (bird_id, image_number) already downloaded
+        
+        # Files already downloaded (or being downloaded) for any species, by URL and content SHA1
+        self.seen_lock = threading.Lock()
+        self.seen_urls = set()
+        self.seen_sha1 = set()
+        
         # Create CrewAI agents
         self.agents = self._create_agents()
     
+    def open_results_log(self, path):
+        """Append download records to a JSONL file, resuming from the records already in it"""
+        
+        path = Path(path)
+        line = '\n'
+        if path.exists():
+            with open(path) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A crash mid-write leaves a truncated last line; that image is re-downloaded
+                        continue
+                    self.completed.add((record['bird_id'], record['image_number']))
+                    self.seen_urls.add(record['source_url'])
+                    if record.get('sha1'):
+                        self.seen_sha1.add(record['sha1'])
+        
+        self.results_log = open(path, 'a')
+        if not line.endswith('\n'):
+            # New records must start on a fresh line after a partial one
+            self.results_log.write('\n')
+        return len(self.completed)
+    
+    def _log_result(self, record):
+        """Write one download record to the JSONL log as soon as it is produced"""
+        
+        if self.results_log is None:
+            return
+        with self.results_lock:
+            self.results_log.write(json.dumps(record) + '\n')
+            self.results_log.flush()
+    
+    def _create_session(self):
+        """Create an HTTP session with connection pooling and retries"""
+        
+        session = requests.Session()
+        session.headers.update({
+            'User-Agent': 'BirdSearchBot/1.0 (https://github.com/your-username/bird-search; your-email@example.com) Python/3.8',
+            'Accept-Language': 'en-US,en;q=0.9'
+        })
+        
+        # On 429/503 the wait comes from the server's Retry-After header when it sends one
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=64, max_retries=retry)
+        session.mount('https://commons.wikimedia.org', adapter)
+        session.mount('https://upload.wikimedia.org', adapter)
+        
+        return session
+    
+    def _get(self, url, **kwargs):
+        """Rate-limited GET through the shared session"""
+        
+        self.limiter.acquire()
+        return self.session.get(url, **kwargs)
+    
+    def _api_query(self, params):
+        """Run a MediaWiki API query, served from the disk cache when possible"""
+        
+        key = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+        data = self.cache.get(key)
+        if data is not None:
+            return data
+        
+        response = self._get(self.base_url, params=params, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+        
+        # Only successful responses are cached; API errors come back as HTTP 200 with an 'error' key
+        if 'error' not in data:
+            self.cache.set(key, data, expire=API_CACHE_TTL)
+        return data
+    
     def _create_agents(self):
         """Create specialized agents for image collection"""
         
@@ -67,6 +219,27 @@ class WikimediaBirdImageCollector:
             'organizer': org_agent
         }
     
+    def _search_term(self, term, limit):
+        """Run a single file search on Wikimedia Commons, with image info for every hit"""
+        
+        # generator=search feeds the hits straight into prop=imageinfo (one round-trip)
+        params = {
+            'action': 'query',
+            'format': 'json',
+            'generator': 'search',
+            'gsrsearch': term,
+            'gsrnamespace': 6,  # File namespace
+            'gsrlimit': limit,
+            'prop': 'imageinfo',
+            'iiprop': 'url|size|sha1|timestamp|extmetadata'
+        }
+        
+        try:
+            return self._api_query(params)
+        except Exception as e:
+            print(f"❌ Search failed for '{term}': {e}")
+            return None
+    
     def search_wikimedia_images(self, species_name, limit=10):
         """Search Wikimedia Commons for bird species images"""
         
@@ -77,92 +250,126 @@ class WikimediaBirdImageCollector:
             f"{species_name} female"
         ]
         
-        all_results = []
-        
-        for term in search_terms:
-            # Search for files
-            params = {
-                'action': 'query',
-                'format': 'json',
-                'list': 'search',
-                'srsearch': term,
-                'srnamespace': 6,  # File namespace
-                'srlimit': limit,
-                'srinfo': 'totalhits|suggestion'
-            }
-            
-            try:
-                response = requests.get(self.base_url, params=params, timeout=10)
-                data = response.json()
-                
-                if 'query' in data and 'search' in data['query']:
-                    for item in data['query']['search']:
-                        title = item['title']
-                        
-                        # Filter for likely bird images
-                        title_lower = title.lower()
-                        if any(ext in title_lower for ext in ['.jpg', '.jpeg', '.png']):
-                            if 'bird' in title_lower or species_name.lower() in title_lower:
-                                all_results.append({
-                                    'title': title,
-                                    'search_term': term,
-                                    'snippet': item.get('snippet', ''),
-                                    'timestamp': item.get('timestamp', '')
-                                })
-                
-                time.sleep(0.5)  # Be respectful
-                
-            except Exception as e:
-                print(f"❌ Search failed for '{term}': {e}")
+        # Issue all search terms at once over the pooled session
+        responses = self.pool.map(lambda term: self._search_term(term, limit), search_terms)
         
-        # Remove duplicates
-        unique_results = []
+        # Results are de-duplicated by title as they arrive
+        results = []
         seen_titles = set()
-        for result in all_results:
-            if result['title'] not in seen_titles:
-                unique_results.append(result)
-                seen_titles.add(result['title'])
+        species_lower = species_name.lower()
+        
+        for term, data in zip(search_terms, responses):
+            if data and 'query' in data and 'pages' in data['query']:
+                # Pages come back keyed by page id; 'index' is the search rank
+                pages = sorted(data['query']['pages'].values(), key=lambda page: page.get('index', 0))
+                for page_data in pages:
+                    title = page_data['title']
+                    if title in seen_titles:
+                        continue
+                    
+                    # Filter for likely bird images
+                    title_lower = title.lower()
+                    if title_lower.endswith(_IMG_EXTS):
+                        if 'bird' in title_lower or species_lower in title_lower:
+                            seen_titles.add(title)
+                            info = self._parse_image_info(page_data, title)
+                            results.append({
+                                'title': title,
+                                'search_term': term,
+                                'timestamp': info['timestamp'] if info else '',
+                                'info': info
+                            })
+        
+        return results[:limit]
+    
+    def _parse_image_info(self, page_data, title):
+        """Extract the image details we use from an API page entry"""
+        
+        if 'imageinfo' not in page_data:
+            return None
         
-        return unique_results[:limit]
+        image_info = page_data['imageinfo'][0]
+        return {
+            'url': image_info.get('url'),
+            'width': image_info.get('width'),
+            'height': image_info.get('height'),
+            'size': image_info.get('size'),
+            'timestamp': image_info.get('timestamp', ''),
+            'sha1': image_info.get('sha1'),
+            'title': title,
+            'description': page_data.get('extract', ''),
+            'metadata': image_info.get('extmetadata', {})
+        }
     
     def get_image_info(self, file_title):
         """Get detailed information about an image"""
         
+        return self.get_image_info_batch([file_title]).get(file_title)
+    
+    def get_image_info_batch(self, file_titles):
+        """Get detailed information about up to 50 images in a single API call"""
+        
+        file_titles = file_titles[:50]  # MediaWiki accepts at most 50 titles per query
+        if not file_titles:
+            return {}
+        
         params = {
             'action': 'query',
             'format': 'json',
-            'titles': file_title,
+            'titles': '|'.join(file_titles),
             'prop': 'imageinfo',
-            'iiprop': 'url|size|metadata|extmetadata'
+            'iiprop': 'url|size|sha1|timestamp|extmetadata'
         }
 
+        print(f"📋 Getting info for {len(file_titles)} images")
+        
         for attempt in range(3):
             try:
-                print(f"📋 Getting info for: {file_title}")
-                delay = 2 ** (attempt + 1)
-                time.sleep(delay)
-
-                response = requests.get(self.base_url, params=params, timeout=10)
-                data = response.json()
+                data = self._api_query(params)
+                query = data.get('query', {})
+                
+                # Map MediaWiki-normalized titles back to the titles we asked for
+                requested_titles = {title: title for title in file_titles}
+                for item in query.get('normalized', []):
+                    requested_titles[item['to']] = item['from']
                 
-                pages = data.get('query', {}).get('pages', {})
-                for page_id, page_data in pages.items():
-                    if 'imageinfo' in page_data:
-                        image_info = page_data['imageinfo'][0]
-                        return {
-                            'url': image_info.get('url'),
-                            'width': image_info.get('width'),
-                            'height': image_info.get('height'),
-                            'size': image_info.get('size'),
-                            'title': file_title,
-                            'description': page_data.get('extract', ''),
-                            'metadata': image_info.get('extmetadata', {})
-                        }
+                info_by_title = {}
+                for page_data in query.get('pages', {}).values():
+                    title = requested_titles.get(page_data['title'], page_data['title'])
+                    info = self._parse_image_info(page_data, title)
+                    if info:
+                        info_by_title[title] = info
+                return info_by_title
             
             except Exception as e:
-                print(f"❌ Failed to get info for {file_title}: {e}")
-            
-            return None
+                print(f"❌ Failed to get info for {len(file_titles)} images (attempt {attempt+1}/3): {e}")
+                if attempt == 2:
+                    return {}
+                # Back off only after a failure, with jitter so parallel retries spread out
+                time.sleep(0.5 * (2 ** attempt) + random.uniform(0, 0.5))
+    
+    def score_images(self, image_infos):
+        """Score a batch of images at once using basic metrics"""
+        
+        width = np.array([info.get('width') or 0 for info in image_infos], dtype=float)
+        height = np.array([info.get('height') or 0 for info in image_infos], dtype=float)
+        size = np.array([info.get('size') or 0 for info in image_infos], dtype=float)
+        
+        # Size scoring (prefer larger images): +1 per tier reached, tiers are nested
+        score = (
+            ((width >= 300) & (height >= 200)).astype(int)
+            + ((width >= 500) & (height >= 400))
+            + ((width >= 800) & (height >= 600))
+        )
+        
+        # Aspect ratio (prefer reasonable bird photo ratios)
+        ratio = np.divide(width, height, out=np.zeros_like(width), where=height > 0)
+        score += 2 * ((width > 0) & (ratio >= 0.8) & (ratio <= 2.0))
+        
+        # File size (prefer not too small, not too huge): 50KB to 5MB
+        score += (size >= 50000) & (size <= 5000000)
+        
+        return score
     
     def evaluate_image_quality(self, image_info):
         """Evaluate image quality using basic metrics"""
@@ -170,30 +377,31 @@ class WikimediaBirdImageCollector:
         if not image_info:
             return 0
         
-        score = 0
-        width = image_info.get('width', 0)
-        height = image_info.get('height', 0)
-        
-        # Size scoring (prefer larger images)
-        if width >= 800 and height >= 600:
-            score += 3
-        elif width >= 500 and height >= 400:
-            score += 2
-        elif width >= 300 and height >= 200:
-            score += 1
-        
-        # Aspect ratio (prefer reasonable bird photo ratios)
-        if width > 0 and height > 0:
-            ratio = width / height
-            if 0.8 <= ratio <= 2.0:  # Reasonable ratios for bird photos
-                score += 2
+        return int(self.score_images([image_info])[0])
+    
+    def _is_seen(self, image_info):
+        """Whether this file was already downloaded for some species (same URL or same content)"""
         
-        # File size (prefer not too small, not too huge)
-        size = image_info.get('size', 0)
-        if 50000 <= size <= 5000000:  # 50KB to 5MB
-            score += 1
+        sha1 = image_info.get('sha1')
+        return image_info.get('url') in self.seen_urls or (sha1 is not None and sha1 in self.seen_sha1)
+    
+    def _claim(self, image_info):
+        """Atomically reserve a file for download; False if another download already has it"""
+        
+        with self.seen_lock:
+            if self._is_seen(image_info):
+                return False
+            self.seen_urls.add(image_info['url'])
+            if image_info.get('sha1'):
+                self.seen_sha1.add(image_info['sha1'])
+            return True
+    
+    def _release(self, image_info):
+        """Give back a reservation after a failed download"""
         
-        return score
+        with self.seen_lock:
+            self.seen_urls.discard(image_info['url'])
+            self.seen_sha1.discard(image_info.get('sha1'))
     
     def download_image(self, image_info, species_name, bird_id, image_number):
         """Download and save an image with proper headers"""
@@ -201,29 +409,42 @@ class WikimediaBirdImageCollector:
         if not image_info or not image_info.get('url'):
             return None
         
+        # The same Commons file often matches several species; download it only once
+        if not self._claim(image_info):
+            print(f"      ⏭️ Already downloaded: {image_info.get('title', image_info['url'])}")
+            return None
+        
+        # Create filename
+        safe_species = species_name.translate(_SAFE_TBL)
+        filename = f"bird_{bird_id:02d}_{image_number}_{safe_species}.jpg"
+        filepath = self.output_dir / filename
+        
         try:
-            # Add proper headers (IMPORTANT!)
-            headers = {
-                'User-Agent': 'BirdSearchBot/1.0 (https://github.com/your-username/bird-search; your-email@example.com) Python/3.8',
-                'Accept': 'image/*',
-                'Accept-Language': 'en-US,en;q=0.9'
-            }
-            
-            # Download image with headers
-            response = requests.get(image_info['url'], headers=headers, timeout=15)
-            response.raise_for_status()
+            # Stream the image in 64KB chunks (the session carries the User-Agent Wikimedia requires):
+            # straight to disk for originals, otherwise into memory for resizing
+            with self._get(image_info['url'], stream=True, timeout=15) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                if self.keep_original:
+                    with open(filepath, 'wb') as f:
+                        shutil.copyfileobj(response.raw, f, length=64 * 1024)
+                else:
+                    buffer = io.BytesIO()
+                    shutil.copyfileobj(response.raw, buffer, length=64 * 1024)
             
-            # Rest of the function remains the same...
-            img = Image.open(io.BytesIO(response.content))
-            
-            # Create filename
-            safe_species = species_name.replace(' ', '_').replace('/', '_')
-            filename = f"bird_{bird_id:02d}_{image_number}_{safe_species}.jpg"
-            filepath = self.output_dir / filename
-            
-            # Save image
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
+            if self.keep_original:
+                original_bytes = os.path.getsize(filepath)
+                stored_width, stored_height = image_info.get('width'), image_info.get('height')
+            else:
+                # Downscale to MAX_IMAGE_DIM and re-encode (JPEG decoding is scaled down via draft mode)
+                original_bytes = buffer.getbuffer().nbytes
+                buffer.seek(0)
+                with Image.open(buffer) as img:
+                    img.thumbnail((MAX_IMAGE_DIM, MAX_IMAGE_DIM), Image.LANCZOS)
+                    img = img.convert('RGB')
+                    img.save(filepath, 'JPEG', quality=85, optimize=True)
+                    stored_width, stored_height = img.size
+            stored_bytes = os.path.getsize(filepath)
             
             print(f"      ✅ Saved: {filename}")
             
@@ -233,9 +454,14 @@ class WikimediaBirdImageCollector:
                 'image_path': str(filepath),
                 'source_url': image_info['url'],
                 'source_title': image_info.get('title', ''),
+                'sha1': image_info.get('sha1'),
                 'width': image_info.get('width'),
                 'height': image_info.get('height'),
-                'file_size_mb': len(response.content) / (1024*1024),
+                'stored_width': stored_width,
+                'stored_height': stored_height,
+                'original_bytes': original_bytes,
+                'stored_bytes': stored_bytes,
+                'file_size_mb': stored_bytes / (1024*1024),
                 'source': 'Wikimedia Commons',
                 'license': 'Free Use (Wikimedia Commons)',
                 'image_number': image_number
@@ -243,6 +469,8 @@ class WikimediaBirdImageCollector:
             
         except Exception as e:
             print(f"❌ Download failed: {e}")
+            filepath.unlink(missing_ok=True)  # Don't leave a truncated file behind
+            self._release(image_info)
             return None
         
     def collect_species_images(self, species_name, bird_id, max_images=3):
@@ -284,6 +512,12 @@ class WikimediaBirdImageCollector:
             expected_output=f"Ranked list of top {max_images} images with quality scores"
         )
         
+        # Image numbers still missing from a previous (resumed) run
+        pending_numbers = [n for n in range(1, max_images + 1) if (bird_id, n) not in self.completed]
+        if not pending_numbers:
+            print(f"   ⏭️ All {max_images} images already downloaded for {species_name}")
+            return []
+        
         # Execute search manually (CrewAI agents provide intelligence)
         print(f"🤖 Agent: Searching Wikimedia Commons...")
         search_results = self.search_wikimedia_images(species_name, limit=15)
@@ -296,36 +530,79 @@ class WikimediaBirdImageCollector:
         
         # Get detailed info and evaluate quality
         print(f"🤖 Agent: Evaluating image quality...")
-        image_candidates = []
-        
-        for result in search_results[:10]:  # Limit API calls
-            info = self.get_image_info(result['title'])
-            if info:
-                quality_score = self.evaluate_image_quality(info)
-                if quality_score > 2:  # Minimum quality threshold
-                    image_candidates.append((info, quality_score))
+        # Image info already came back with the search results
+        infos = [
+            result['info'] for result in search_results[:10]
+            if result['info'] and not self._is_seen(result['info'])
+        ]
+        scores = self.score_images(infos)
         
-        # Sort by quality score
-        image_candidates.sort(key=lambda x: x[1], reverse=True)
+        # Keep candidates above the minimum quality threshold, best first (ties keep search order)
+        order = np.argsort(-scores, kind='stable')
+        image_candidates = [(infos[i], int(scores[i])) for i in order if scores[i] > 2]
         
         # Download best images
         print(f"🤖 Agent: Organizing and downloading best {max_images} images...")
         downloaded = []
         
-        for i, (image_info, score) in enumerate(image_candidates[:max_images]):
-            print(f"   📥 Downloading image {i+1}/{max_images} (score: {score})")
+        # Each download writes its own file, so they can run side by side
+        best = list(zip(pending_numbers, image_candidates))
+        futures = [
+            self.pool.submit(self.download_image, image_info, species_name, bird_id, image_number)
+            for image_number, (image_info, score) in best
+        ]
+        
+        for future, (image_number, (image_info, score)) in zip(futures, best):
+            print(f"   📥 Downloading image {image_number}/{max_images} (score: {score})")
             
-            result = self.download_image(image_info, species_name, bird_id, i+1)
+            result = future.result()
             if result:
                 result['quality_score'] = score
+                self._log_result(result)
                 downloaded.append(result)
                 print(f"      ✅ Saved: {Path(result['image_path']).name}")
-            
-            time.sleep(1)  # Be respectful
         
         print(f"   🎉 Successfully downloaded {len(downloaded)} images for {species_name}")
         return downloaded
 
+# Number of species collected at the same time
+SPECIES_CONCURRENCY = 4
+
+# Download records are appended here as they are produced, so interrupted runs can resume
+RESULTS_JSONL = 'wikimedia_bird_images.jsonl'
+
+async def _collect_species_concurrently(collector, features_list, images_per_bird):
+    """Run collect_species_images for all species, SPECIES_CONCURRENCY at a time"""
+    
+    semaphore = asyncio.Semaphore(SPECIES_CONCURRENCY)
+    progress = {'processed': 0, 'successful': 0, 'images': 0}
+    
+    async def collect(i, bird_data):
+        species_name = bird_data['species_name']
+        bird_id = bird_data['bird_id']
+        
+        async with semaphore:
+            print(f"\n📸 Processing {i+1}/{len(features_list)}: {species_name}")
+            downloaded = await asyncio.to_thread(
+                collector.collect_species_images, species_name, bird_id, images_per_bird
+            )
+        
+        progress['processed'] += 1
+        if downloaded:
+            progress['successful'] += 1
+            progress['images'] += len(downloaded)
+        
+        # Progress update
+        if progress['processed'] % 10 == 0:
+            print(f"\n📊 Progress: {progress['processed']}/{len(features_list)} species processed")
+            print(f"   ✅ Successful: {progress['successful']}")
+            print(f"   📸 Images downloaded: {progress['images']}")
+        
+        return len(downloaded)
+    
+    # Records are streamed to the JSONL log; only per-species counts come back here
+    return await asyncio.gather(*[collect(i, bird_data) for i, bird_data in enumerate(features_list)])
+
 def collect_all_bird_images(features_file="bird_features.pkl", images_per_bird=2):
     """Main function to collect images for all bird species"""
     
@@ -339,37 +616,26 @@ def collect_all_bird_images(features_file="bird_features.pkl", images_per_bird=2
     print(f"📋 Processing {len(features_list)} bird species")
     print(f"🎯 Target: {images_per_bird} images per species")
     
-    # Initialize collector
+    # Initialize collector, resuming from any records logged by an earlier run
     collector = WikimediaBirdImageCollector()
+    already_done = collector.open_results_log(RESULTS_JSONL)
+    if already_done:
+        print(f"⏭️ Resuming: {already_done} images already downloaded")
     
-    # Process each species
-    all_downloaded = []
-    successful_species = 0
-    
-    for i, bird_data in enumerate(features_list):
-        species_name = bird_data['species_name']
-        bird_id = bird_data['bird_id']
-        
-        print(f"\n📸 Processing {i+1}/{len(features_list)}: {species_name}")
-        
-        # Collect images for this species
-        downloaded = collector.collect_species_images(species_name, bird_id, images_per_bird)
-        
-        if downloaded:
-            all_downloaded.extend(downloaded)
-            successful_species += 1
-        
-        # Progress update
-        if (i + 1) % 10 == 0:
-            print(f"\n📊 Progress: {i+1}/{len(features_list)} species processed")
-            print(f"   ✅ Successful: {successful_species}")
-            print(f"   📸 Images downloaded: {len(all_downloaded)}")
+    # Process species concurrently
+    try:
+        asyncio.run(_collect_species_concurrently(collector, features_list, images_per_bird))
+    finally:
+        collector.results_log.close()
     
     # Save results
     print(f"\n💾 Saving results...")
     
-    # Create summary DataFrame
-    results_df = pd.DataFrame(all_downloaded)
+    # Build the CSV outputs from the JSONL log (covers resumed runs too)
+    if os.path.getsize(RESULTS_JSONL) == 0:
+        print("❌ No images downloaded")
+        return []
+    results_df = pd.read_json(RESULTS_JSONL, lines=True)
     results_df.to_csv('wikimedia_bird_images.csv', index=False)
     
     # Create species summary
@@ -382,13 +648,13 @@ def collect_all_bird_images(features_file="bird_features.pkl", images_per_bird=2
     species_summary.to_csv('bird_images_summary.csv', index=False)
     
     print(f"\n🎉 Collection Complete!")
-    print(f"   📊 Total images: {len(all_downloaded)}")
-    print(f"   🐦 Successful species: {successful_species}/{len(features_list)}")
+    print(f"   📊 Total images: {len(results_df)}")
+    print(f"   🐦 Successful species: {results_df['bird_id'].nunique()}/{len(features_list)}")
     print(f"   📁 Images saved to: {collector.output_dir}")
-    print(f"   📄 Log saved to: wikimedia_bird_images.csv")
+    print(f"   📄 Log saved to: wikimedia_bird_images.csv ({RESULTS_JSONL})")
     print(f"   📈 Summary saved to: bird_images_summary.csv")
     
-    return all_downloaded
+    return results_df.to_dict('records')
 
 def quick_test_collection(species_name="Common Redpoll"):
     """Test the collection system on a single species"""
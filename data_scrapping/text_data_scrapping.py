@@ -1,78 +1,379 @@
 import os
+import argparse
+import hashlib
+import diskcache
 import pandas as pd
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 import re
 import time
-from typing import Dict, List
-from crewai import Agent, Task, Crew
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+from crewai import Agent, Task, Crew, Process
 from crewai.tools import tool
 
 # Set up API keys (add your actual keys)
 # os.environ["OPENAI_API_KEY"] = "your-openai-api-key"  # Uncomment and add your key
 
+# Shared keep-alive session so every Wikipedia lookup reuses the same pooled HTTPS connection
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=20,
+    pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+))
+_SESSION.headers.update({
+    'User-Agent': 'BirdsDiscovery/1.0 (contact@example.com)',
+    'Accept-Encoding': 'gzip, deflate'
+})
+
+# On-disk cache of Wikipedia summaries, so reruns don't refetch unchanged pages
+WIKI_CACHE_DIR = '.wiki_cache'
+WIKI_CACHE_TTL = 30 * 24 * 3600  # seconds
+_WIKI_CACHE = diskcache.Cache(WIKI_CACHE_DIR)
+
+# Finished species profiles, keyed by species and CSV metadata, so reruns skip the LLM crews
+PROFILE_CACHE_DIR = '.bird_profile_cache'
+PROFILE_CACHE_TTL = 90 * 24 * 3600  # seconds
+_PROFILE_CACHE = diskcache.Cache(PROFILE_CACHE_DIR)
+
+# Set to False (--no-cache) to ignore cached summaries and profiles and recompute everything
+USE_CACHE = True
+
+# Batched lookups: the extracts API returns at most 20 intros per request
+WIKI_API_URL = 'https://en.wikipedia.org/w/api.php'
+WIKI_BATCH_SIZE = 20
+
+# Summaries loaded in bulk before the crews start; fetch_wikipedia_data checks here first
+_PREFETCHED_SUMMARIES = {}
+
+# CSV columns passed to the synthesis task as metadata
+METADATA_COLUMNS = ('bird_id', 'image_count', 'quality_score', 'file_size_mb')
+
+# Profiles are appended here one JSON object per line as species finish, so a crash keeps finished work
+OUTPUT_JSONL = 'crewai_comprehensive_bird_database.jsonl'
+
+# Species analysed concurrently (each crew run is dominated by blocking HTTP/LLM calls)
+MAX_WORKERS = 8
+
+# Cap on simultaneous Wikipedia requests across all worker threads
+_WIKIPEDIA_SLOTS = threading.BoundedSemaphore(4)
+
+# Keeps progress lines from different workers from interleaving
+_PRINT_LOCK = threading.Lock()
+
+# Request budgets shared by all worker threads, in requests per minute
+WIKI_REQUESTS_PER_MINUTE = 200
+LLM_REQUESTS_PER_MINUTE = int(os.getenv('LLM_REQUESTS_PER_MINUTE', '500'))  # set to your provider's RPM
+# Worst-case LLM calls per crew run: each agent makes up to max_iter calls plus one forced
+# final answer once max_iter is hit (4 agents at max_iter=2, the synthesizer at max_iter=1).
+# Keep in sync with create_agents; reserving less lets parallel crews overshoot the budget
+LLM_CALLS_PER_CREW = 4 * (2 + 1) + (1 + 1)
+
+class TokenBucket:
+    """Thread-safe token bucket: a sustained rate with short bursts up to capacity"""
+    
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self, tokens=1):
+        """Block until `tokens` requests may be sent"""
+        
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+_WIKI_LIMIT = TokenBucket(WIKI_REQUESTS_PER_MINUTE / 60)
+_LLM_LIMIT = TokenBucket(LLM_REQUESTS_PER_MINUTE / 60, capacity=max(LLM_REQUESTS_PER_MINUTE / 60, LLM_CALLS_PER_CREW))
+
+def _dumps(obj) -> str:
+    """Indented JSON text via orjson (much faster than the stdlib encoder)"""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+
+# Markdown code fence (```json ... ```) that LLMs often wrap their JSON answer in
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*```\s*$", re.DOTALL)
+
+# Scientific name extraction patterns, compiled once
+_SCI_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'\(([A-Z][a-z]+ [a-z]+)\)',  # (Genus species)
+    r'^([A-Z][a-z]+ [a-z]+)',    # Genus species at start
+    r'scientific name[:\s]+([A-Z][a-z]+ [a-z]+)',
+    r'binomial name[:\s]+([A-Z][a-z]+ [a-z]+)'
+)]
+
+# Family extraction patterns, compiled once
+_FAM_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r'family ([A-Z][a-z]+idae)',
+    r'([A-Z][a-z]+idae) family',
+    r'belongs to the family ([A-Z][a-z]+idae)',
+    r'member of the ([A-Z][a-z]+idae)',
+    r'of the ([A-Z][a-z]+idae) family'
+)]
+
+# Comprehensive habitat mapping
+_HABITAT_KEYWORDS = {
+    'forest': ['forest', 'woodland', 'trees', 'canopy', 'rainforest', 'coniferous', 'deciduous', 'tropical forest'],
+    'wetland': ['wetland', 'marsh', 'swamp', 'water', 'pond', 'lake', 'river', 'streams', 'bog', 'fen'],
+    'grassland': ['grassland', 'prairie', 'field', 'meadow', 'savanna', 'steppe', 'pasture', 'rangeland'],
+    'urban': ['urban', 'city', 'suburban', 'parks', 'gardens', 'buildings', 'developed areas', 'human settlements'],
+    'coastal': ['coastal', 'shore', 'beach', 'ocean', 'sea', 'marine', 'seashore', 'tidal', 'estuarine'],
+    'mountain': ['mountain', 'alpine', 'highland', 'cliff', 'rocky', 'peaks', 'montane', 'subalpine'],
+    'desert': ['desert', 'arid', 'dry', 'scrubland', 'semi-arid', 'xeric'],
+    'agricultural': ['farm', 'agricultural', 'crop', 'cultivated', 'orchard', 'plantation']
+}
+
+# Geographic regions
+_REGION_KEYWORDS = {
+    'africa': ['africa', 'african', 'sahara', 'congo', 'ethiopia', 'kenya', 'tanzania'],
+    'europe': ['europe', 'european', 'scandinavia', 'mediterranean', 'britain', 'ireland'],
+    'asia': ['asia', 'asian', 'siberia', 'china', 'india', 'japan', 'southeast asia'],
+    'north_america': ['north america', 'canada', 'united states', 'alaska', 'mexico', 'greenland'],
+    'south_america': ['south america', 'brazil', 'argentina', 'colombia', 'peru', 'amazon', 'andes'],
+    'australia': ['australia', 'australian', 'new zealand', 'tasmania', 'oceania'],
+    'arctic': ['arctic', 'polar', 'tundra', 'subarctic', 'boreal']
+}
+
+# Behavioral patterns
+_BEHAVIOR_KEYWORDS = {
+    'migratory': ['migrate', 'migration', 'migratory', 'seasonal movement'],
+    'resident': ['resident', 'non-migratory', 'year-round', 'permanent resident'],
+    'nocturnal': ['nocturnal', 'night', 'nighttime', 'active at night'],
+    'diurnal': ['diurnal', 'day', 'daytime', 'active during day'],
+    'territorial': ['territorial', 'defend territory', 'aggressive', 'territorial behavior'],
+    'colonial': ['colonial', 'colony', 'communal', 'group nesting']
+}
+
+# primary_colors stops growing after this many distinct colors (descriptions rarely name more)
+MAX_COLORS = 8
+
+_COLOR_WORDS = ['black', 'white', 'brown', 'gray', 'grey', 'red', 'blue', 'green', 'yellow',
+                'orange', 'purple', 'pink', 'golden', 'silver', 'chestnut', 'rufous']
+
+def _keyword_regex(keywords):
+    """One alternation over all keywords; the lookahead reports overlapping hits like substring checks do"""
+    alternation = '|'.join(re.escape(k) for k in sorted(set(keywords), key=len, reverse=True))
+    return re.compile(f'(?=({alternation}))')
+
+def _reverse_lookup(keyword_map):
+    """Map each keyword back to the category it belongs to"""
+    return {keyword: category for category, keywords in keyword_map.items() for keyword in keywords}
+
+_HABITAT_OF = _reverse_lookup(_HABITAT_KEYWORDS)
+_REGION_OF = _reverse_lookup(_REGION_KEYWORDS)
+_BEHAVIOR_OF = _reverse_lookup(_BEHAVIOR_KEYWORDS)
+
+_HABITAT_RE = _keyword_regex(_HABITAT_OF)
+_REGION_RE = _keyword_regex(_REGION_OF)
+_BEHAVIOR_RE = _keyword_regex(_BEHAVIOR_OF)
+_COLOR_RE = _keyword_regex(_COLOR_WORDS)
+
+def _match_categories(regex, category_of, keyword_map, text_lower):
+    """Categories with at least one keyword in the text, in keyword_map order"""
+    found = {category_of[hit] for hit in regex.findall(text_lower)}
+    return [category for category in keyword_map if category in found]
+
+# Single-valued traits: within each category the first label with a matching phrase wins
+_TRAIT_RULES = {
+    'size': [
+        ('tiny', ['tiny', 'very small', 'smallest', 'miniature', 'diminutive']),
+        ('small', ['small', 'little', 'petite', 'compact']),
+        ('large', ['large', 'big', 'sizeable', 'robust']),
+        ('very_large', ['very large', 'huge', 'massive', 'giant', 'enormous'])
+    ],
+    'feeding': [
+        ('insectivore', ['insect', 'insects', 'bug', 'larvae', 'arthropod', 'invertebrate']),
+        ('granivore', ['seed', 'seeds', 'grain', 'nuts', 'berries']),
+        ('piscivore', ['fish', 'fishing', 'aquatic prey', 'piscivorous']),
+        ('nectivore', ['nectar', 'flower', 'pollen', 'pollinator']),
+        ('frugivore', ['fruit', 'berry', 'berries', 'frugivorous']),
+        ('carnivore', ['predator', 'prey', 'hunt', 'carnivorous', 'meat', 'rodent']),
+        ('scavenger', ['carrion', 'scaveng', 'dead', 'carcass'])
+    ],
+    'social': [
+        ('social', ['flock', 'group', 'social', 'communal', 'gregarious']),
+        ('solitary', ['solitary', 'alone', 'isolated', 'individual'])
+    ],
+    'migration': [
+        ('long_distance', ['long-distance', 'long distance', 'transoceanic', 'intercontinental']),
+        ('short_distance', ['short-distance', 'short distance', 'partial', 'altitudinal']),
+        ('resident', ['resident', 'non-migratory', 'year-round'])
+    ],
+    'vocalization': [
+        ('melodic', ['song', 'melodic', 'musical', 'singing', 'melodious']),
+        ('harsh', ['call', 'harsh', 'loud', 'screech', 'cry']),
+        ('soft', ['quiet', 'soft', 'whisper', 'subtle'])
+    ]
+}
+
+_TRAIT_DEFAULTS = {'size': 'medium', 'feeding': 'omnivore', 'social': 'pairs', 'migration': 'unknown', 'vocalization': 'unknown'}
+
+def _build_trait_lookup():
+    """Map each phrase to every (category, label) it implies, including those of phrases it starts with"""
+    labels = {}
+    for category, rules in _TRAIT_RULES.items():
+        for label, phrases in rules:
+            for phrase in phrases:
+                labels.setdefault(phrase, set()).add((category, label))
+    # The scan reports only the longest phrase at each position, so it must also carry its prefixes' labels
+    return {phrase: set().union(*(labels[p] for p in labels if phrase.startswith(p))) for phrase in labels}
+
+_TRAIT_OF = _build_trait_lookup()
+_TRAIT_RE = _keyword_regex(_TRAIT_OF)
+
+def _classify_traits(text_lower):
+    """Winning label for every single-valued trait from one scan of the text"""
+    hits = set()
+    for phrase in _TRAIT_RE.findall(text_lower):
+        hits |= _TRAIT_OF[phrase]
+    return {
+        category: next((label for label, _ in rules if (category, label) in hits), _TRAIT_DEFAULTS[category])
+        for category, rules in _TRAIT_RULES.items()
+    }
+
+def fetch_wikipedia_batch(species_list: List[str]) -> Dict[str, str]:
+    """Fetch intro, page URL and thumbnail for up to WIKI_BATCH_SIZE species in one API call.
+    Returns {species_name: summary JSON} for the pages that exist."""
+    titles = {species: species.replace(' ', '_') for species in species_list[:WIKI_BATCH_SIZE]}
+    params = {
+        'action': 'query',
+        'format': 'json',
+        'formatversion': 2,
+        'prop': 'extracts|pageimages|info',
+        'exintro': 1,
+        'explaintext': 1,
+        'exlimit': 'max',
+        'piprop': 'thumbnail',
+        'pithumbsize': 320,
+        'pilimit': 'max',
+        'inprop': 'url',
+        'redirects': 1,
+        'titles': '|'.join(titles.values())
+    }
+    
+    _WIKI_LIMIT.acquire()
+    # The slot is held until the body has been read, not just until the headers arrive
+    with _WIKIPEDIA_SLOTS, _SESSION.get(WIKI_API_URL, params=params, timeout=10) as response:
+        response.raise_for_status()
+        query = response.json().get('query', {})
+    
+    renamed = {r['from']: r['to'] for r in query.get('normalized', []) + query.get('redirects', [])}
+    pages = {page['title']: page for page in query.get('pages', []) if not page.get('missing')}
+    
+    summaries = {}
+    for species, title in titles.items():
+        # Follow title normalization, then a redirect, back from the requested name
+        title = renamed.get(title, title)
+        title = renamed.get(title, title)
+        page = pages.get(title)
+        if page:
+            summaries[species] = _dumps({
+                'species_name': species,
+                'extract': page.get('extract', ''),
+                'url': page.get('fullurl', ''),
+                'thumbnail': page.get('thumbnail', {}).get('source', ''),
+                'success': True
+            })
+    
+    return summaries
+
+def prefetch_wikipedia_summaries(species_names: List[str]):
+    """Load summaries for all species WIKI_BATCH_SIZE at a time, before the crews ask one by one"""
+    todo = [species for species in species_names if not (USE_CACHE and species in _WIKI_CACHE)]
+    
+    for i in range(0, len(todo), WIKI_BATCH_SIZE):
+        batch = todo[i:i + WIKI_BATCH_SIZE]
+        try:
+            summaries = fetch_wikipedia_batch(batch)
+        except Exception as e:
+            print(f"⚠️  Batch Wikipedia fetch failed, falling back to per-species lookups: {e}")
+            continue
+        
+        for species, summary in summaries.items():
+            _PREFETCHED_SUMMARIES[species] = summary
+            _WIKI_CACHE.set(species, summary, expire=WIKI_CACHE_TTL)
+    
+    print(f"📚 Prefetched {len(_PREFETCHED_SUMMARIES)}/{len(todo)} Wikipedia summaries in batches of {WIKI_BATCH_SIZE}")
+
 # Custom Tools using CrewAI's proper decorator
 @tool
 def fetch_wikipedia_data(species_name: str) -> str:
     """Fetch comprehensive bird data from Wikipedia API for a given species name.
     Returns JSON string with extract, URL, and thumbnail information."""
+    prefetched = _PREFETCHED_SUMMARIES.get(species_name)
+    if prefetched is not None:
+        return prefetched
+    
+    if USE_CACHE:
+        cached = _WIKI_CACHE.get(species_name)
+        if cached is not None:
+            return cached
+    
     try:
         clean_name = species_name.replace(' ', '_')
         url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{clean_name}"
         
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            result = {
-                'species_name': species_name,
-                'extract': data.get('extract', ''),
-                'url': data.get('content_urls', {}).get('desktop', {}).get('page', ''),
-                'thumbnail': data.get('thumbnail', {}).get('source', '') if data.get('thumbnail') else '',
-                'success': True
-            }
-            return json.dumps(result, indent=2)
+        _WIKI_LIMIT.acquire()
+        # The slot is held until the body has been read; closing the response hands the
+        # connection back to the pool, even on early returns
+        with _WIKIPEDIA_SLOTS, _SESSION.get(url, timeout=10, stream=True) as response:
+            if response.status_code == 404:
+                return _dumps({'species_name': species_name, 'error': 'No data found', 'success': False})
+            
+            if response.status_code == 200:
+                data = response.json()
+                result = {
+                    'species_name': species_name,
+                    'extract': data.get('extract', ''),
+                    'url': data.get('content_urls', {}).get('desktop', {}).get('page', ''),
+                    'thumbnail': data.get('thumbnail', {}).get('source', '') if data.get('thumbnail') else '',
+                    'success': True
+                }
+                result_json = _dumps(result)
+                
+                # Only successful lookups are cached so failures get retried next run
+                _WIKI_CACHE.set(species_name, result_json, expire=WIKI_CACHE_TTL)
+                return result_json
     except Exception as e:
         error_result = {
             'species_name': species_name,
             'error': f"Error fetching {species_name}: {str(e)}",
             'success': False
         }
-        return json.dumps(error_result, indent=2)
+        return _dumps(error_result)
     
-    return json.dumps({'species_name': species_name, 'error': 'No data found', 'success': False})
+    return _dumps({'species_name': species_name, 'error': 'No data found', 'success': False})
 
-@tool
-def extract_taxonomy_info(wikipedia_text: str) -> str:
-    """Extract scientific name and family classification from Wikipedia text.
-    Returns JSON with scientific_name and family fields."""
-    
-    # Scientific name extraction patterns
-    scientific_patterns = [
-        r'\(([A-Z][a-z]+ [a-z]+)\)',  # (Genus species)
-        r'^([A-Z][a-z]+ [a-z]+)',    # Genus species at start
-        r'scientific name[:\s]+([A-Z][a-z]+ [a-z]+)',
-        r'binomial name[:\s]+([A-Z][a-z]+ [a-z]+)'
-    ]
+# The analyzers are pure functions of the extract text, and every task or LLM retry
+# for a species passes the same text, so their bodies are memoized behind the tools
+@lru_cache(maxsize=4096)
+def _extract_taxonomy_info_cached(wikipedia_text: str) -> str:
+    """Cached body of extract_taxonomy_info"""
     
     scientific_name = 'Unknown'
-    for pattern in scientific_patterns:
-        match = re.search(pattern, wikipedia_text, re.IGNORECASE)
+    for pattern in _SCI_PATTERNS:
+        match = pattern.search(wikipedia_text)
         if match:
             scientific_name = match.group(1)
             break
     
-    # Family extraction patterns
-    family_patterns = [
-        r'family ([A-Z][a-z]+idae)',
-        r'([A-Z][a-z]+idae) family',
-        r'belongs to the family ([A-Z][a-z]+idae)',
-        r'member of the ([A-Z][a-z]+idae)',
-        r'of the ([A-Z][a-z]+idae) family'
-    ]
-    
     family = 'Unknown'
-    for pattern in family_patterns:
-        match = re.search(pattern, wikipedia_text, re.IGNORECASE)
+    for pattern in _FAM_PATTERNS:
+        match = pattern.search(wikipedia_text)
         if match:
             family = match.group(1)
             break
@@ -83,47 +384,22 @@ def extract_taxonomy_info(wikipedia_text: str) -> str:
         'extraction_success': scientific_name != 'Unknown' or family != 'Unknown'
     }
     
-    return json.dumps(result, indent=2)
+    return _dumps(result)
 
 @tool
-def analyze_habitat_geography(wikipedia_text: str) -> str:
-    """Analyze habitat preferences and geographic distribution from Wikipedia text.
-    Returns JSON with habitats and geographic_regions arrays."""
-    
-    text_lower = wikipedia_text.lower()
-    
-    # Comprehensive habitat mapping
-    habitats = []
-    habitat_keywords = {
-        'forest': ['forest', 'woodland', 'trees', 'canopy', 'rainforest', 'coniferous', 'deciduous', 'tropical forest'],
-        'wetland': ['wetland', 'marsh', 'swamp', 'water', 'pond', 'lake', 'river', 'streams', 'bog', 'fen'],
-        'grassland': ['grassland', 'prairie', 'field', 'meadow', 'savanna', 'steppe', 'pasture', 'rangeland'],
-        'urban': ['urban', 'city', 'suburban', 'parks', 'gardens', 'buildings', 'developed areas', 'human settlements'],
-        'coastal': ['coastal', 'shore', 'beach', 'ocean', 'sea', 'marine', 'seashore', 'tidal', 'estuarine'],
-        'mountain': ['mountain', 'alpine', 'highland', 'cliff', 'rocky', 'peaks', 'montane', 'subalpine'],
-        'desert': ['desert', 'arid', 'dry', 'scrubland', 'semi-arid', 'xeric'],
-        'agricultural': ['farm', 'agricultural', 'crop', 'cultivated', 'orchard', 'plantation']
-    }
+def extract_taxonomy_info(wikipedia_text: str) -> str:
+    """Extract scientific name and family classification from Wikipedia text.
+    Returns JSON with scientific_name and family fields."""
+    return _extract_taxonomy_info_cached(wikipedia_text)
+
+def _habitat_analysis(text_lower: str) -> dict:
+    """Habitat and geographic range of an already lowercased text"""
     
-    for habitat, keywords in habitat_keywords.items():
-        if any(keyword in text_lower for keyword in keywords):
-            habitats.append(habitat)
+    # One regex pass per category instead of a substring scan per keyword
+    habitats = _match_categories(_HABITAT_RE, _HABITAT_OF, _HABITAT_KEYWORDS, text_lower)
     
     # Geographic regions analysis
-    regions = []
-    region_keywords = {
-        'africa': ['africa', 'african', 'sahara', 'congo', 'ethiopia', 'kenya', 'tanzania'],
-        'europe': ['europe', 'european', 'scandinavia', 'mediterranean', 'britain', 'ireland'],
-        'asia': ['asia', 'asian', 'siberia', 'china', 'india', 'japan', 'southeast asia'],
-        'north_america': ['north america', 'canada', 'united states', 'alaska', 'mexico', 'greenland'],
-        'south_america': ['south america', 'brazil', 'argentina', 'colombia', 'peru', 'amazon', 'andes'],
-        'australia': ['australia', 'australian', 'new zealand', 'tasmania', 'oceania'],
-        'arctic': ['arctic', 'polar', 'tundra', 'subarctic', 'boreal']
-    }
-    
-    for region, keywords in region_keywords.items():
-        if any(keyword in text_lower for keyword in keywords):
-            regions.append(region)
+    regions = _match_categories(_REGION_RE, _REGION_OF, _REGION_KEYWORDS, text_lower)
     
     result = {
         'habitats': habitats or ['unknown'],
@@ -132,163 +408,142 @@ def analyze_habitat_geography(wikipedia_text: str) -> str:
         'geographic_spread': len(regions)
     }
     
-    return json.dumps(result, indent=2)
+    return result
 
-@tool
-def analyze_bird_behavior(wikipedia_text: str) -> str:
-    """Comprehensive analysis of bird behavioral patterns, physical traits, and ecological roles.
-    Returns detailed JSON with size, behaviors, feeding, social structure, migration, colors, and vocalizations."""
-    
-    text_lower = wikipedia_text.lower()
+def _behavior_analysis(text_lower: str) -> dict:
+    """Size, behavior, diet, social, migration, color and voice traits of an already lowercased text"""
     
-    # Size classification with more specific patterns
-    size_category = 'medium'
-    if any(phrase in text_lower for phrase in ['tiny', 'very small', 'smallest', 'miniature', 'diminutive']):
-        size_category = 'tiny'
-    elif any(phrase in text_lower for phrase in ['small', 'little', 'petite', 'compact']):
-        size_category = 'small'  
-    elif any(phrase in text_lower for phrase in ['large', 'big', 'sizeable', 'robust']):
-        size_category = 'large'
-    elif any(phrase in text_lower for phrase in ['very large', 'huge', 'massive', 'giant', 'enormous']):
-        size_category = 'very_large'
+    # Size, diet, social, migration and voice classes in a single scan
+    traits = _classify_traits(text_lower)
     
     # Behavioral patterns
-    behaviors = []
-    behavior_keywords = {
-        'migratory': ['migrate', 'migration', 'migratory', 'seasonal movement'],
-        'resident': ['resident', 'non-migratory', 'year-round', 'permanent resident'],
-        'nocturnal': ['nocturnal', 'night', 'nighttime', 'active at night'],
-        'diurnal': ['diurnal', 'day', 'daytime', 'active during day'],
-        'territorial': ['territorial', 'defend territory', 'aggressive', 'territorial behavior'],
-        'colonial': ['colonial', 'colony', 'communal', 'group nesting']
-    }
+    behaviors = _match_categories(_BEHAVIOR_RE, _BEHAVIOR_OF, _BEHAVIOR_KEYWORDS, text_lower)
     
-    for behavior, keywords in behavior_keywords.items():
-        if any(keyword in text_lower for keyword in keywords):
-            behaviors.append(behavior)
-    
-    # Feeding behavior analysis
-    feeding_type = 'omnivore'
-    feeding_keywords = {
-        'insectivore': ['insect', 'insects', 'bug', 'larvae', 'arthropod', 'invertebrate'],
-        'granivore': ['seed', 'seeds', 'grain', 'nuts', 'berries'],
-        'piscivore': ['fish', 'fishing', 'aquatic prey', 'piscivorous'],
-        'nectivore': ['nectar', 'flower', 'pollen', 'pollinator'],
-        'frugivore': ['fruit', 'berry', 'berries', 'frugivorous'],
-        'carnivore': ['predator', 'prey', 'hunt', 'carnivorous', 'meat', 'rodent'],
-        'scavenger': ['carrion', 'scaveng', 'dead', 'carcass']
-    }
-    
-    for feeding, keywords in feeding_keywords.items():
-        if any(keyword in text_lower for keyword in keywords):
-            feeding_type = feeding
+    # Color extraction, stopping the scan once MAX_COLORS distinct colors are seen
+    found_colors = set()
+    for match in _COLOR_RE.finditer(text_lower):
+        found_colors.add(match.group(1))
+        if len(found_colors) >= MAX_COLORS:
             break
-    
-    # Social structure
-    social_structure = 'pairs'
-    if any(phrase in text_lower for phrase in ['flock', 'group', 'social', 'communal', 'gregarious']):
-        social_structure = 'social'
-    elif any(phrase in text_lower for phrase in ['solitary', 'alone', 'isolated', 'individual']):
-        social_structure = 'solitary'
-    
-    # Migration patterns
-    migration_type = 'unknown'
-    if any(phrase in text_lower for phrase in ['long-distance', 'long distance', 'transoceanic', 'intercontinental']):
-        migration_type = 'long_distance'
-    elif any(phrase in text_lower for phrase in ['short-distance', 'short distance', 'partial', 'altitudinal']):
-        migration_type = 'short_distance'
-    elif any(phrase in text_lower for phrase in ['resident', 'non-migratory', 'year-round']):
-        migration_type = 'resident'
-    
-    # Color extraction
-    colors = []
-    color_words = ['black', 'white', 'brown', 'gray', 'grey', 'red', 'blue', 'green', 'yellow', 
-                   'orange', 'purple', 'pink', 'golden', 'silver', 'chestnut', 'rufous']
-    
-    for color in color_words:
-        if color in text_lower:
-            colors.append(color)
-    
-    # Vocalization analysis
-    vocalization = 'unknown'
-    if any(phrase in text_lower for phrase in ['song', 'melodic', 'musical', 'singing', 'melodious']):
-        vocalization = 'melodic'
-    elif any(phrase in text_lower for phrase in ['call', 'harsh', 'loud', 'screech', 'cry']):
-        vocalization = 'harsh'
-    elif any(phrase in text_lower for phrase in ['quiet', 'soft', 'whisper', 'subtle']):
-        vocalization = 'soft'
+    colors = [color for color in _COLOR_WORDS if color in found_colors]
     
     result = {
-        'size_category': size_category,
+        'size_category': traits['size'],
         'behaviors': behaviors,
-        'feeding_type': feeding_type,
-        'social_structure': social_structure,
-        'migration_type': migration_type,
+        'feeding_type': traits['feeding'],
+        'social_structure': traits['social'],
+        'migration_type': traits['migration'],
         'primary_colors': colors,
-        'vocalization': vocalization,
+        'vocalization': traits['vocalization'],
         'behavior_complexity': len(behaviors),
         'color_diversity': len(colors)
     }
     
-    return json.dumps(result, indent=2)
-
-# Define specialized agents
-wikipedia_researcher = Agent(
-    role='Wikipedia Data Researcher',
-    goal='Efficiently fetch comprehensive Wikipedia data for bird species',
-    backstory="""You are an expert ornithological data collector with deep knowledge of Wikipedia's API structure. 
-    Your specialty is gathering reliable, comprehensive information about bird species from Wikipedia's vast database. 
-    You understand the nuances of scientific nomenclature and can navigate Wikipedia's data structure expertly.""",
-    tools=[fetch_wikipedia_data],
-    verbose=True,
-    max_iter=2
-)
-
-taxonomy_specialist = Agent(
-    role='Avian Taxonomy Expert',
-    goal='Extract accurate taxonomic classifications and scientific nomenclature',
-    backstory="""You are a world-renowned ornithological taxonomist with expertise in bird classification systems. 
-    You have spent decades studying phylogenetic relationships and can identify scientific names, family classifications, 
-    and taxonomic hierarchies with exceptional accuracy. Your knowledge spans both modern and historical nomenclature.""",
-    tools=[extract_taxonomy_info],
-    verbose=True,
-    max_iter=2
-)
-
-habitat_ecologist = Agent(
-    role='Habitat and Biogeography Specialist',
-    goal='Analyze habitat preferences and geographic distribution patterns',
-    backstory="""You are an ecological specialist focusing on avian biogeography and habitat analysis. 
-    Your expertise covers global ecosystems, migration corridors, and species distribution patterns. 
-    You excel at identifying environmental requirements and geographic ranges from descriptive texts.""",
-    tools=[analyze_habitat_geography],
-    verbose=True,
-    max_iter=2
-)
-
-behavioral_biologist = Agent(
-    role='Avian Behavioral Ecologist',
-    goal='Analyze comprehensive behavioral patterns and ecological roles',
-    backstory="""You are a leading behavioral ecologist specializing in avian behavior, feeding ecology, 
-    and social structures. Your research covers migration patterns, breeding behaviors, foraging strategies, 
-    and interspecies interactions. You can extract complex behavioral insights from observational data.""",
-    tools=[analyze_bird_behavior],
-    verbose=True,
-    max_iter=2
-)
-
-data_synthesizer = Agent(
-    role='Ornithological Data Integration Specialist',
-    goal='Synthesize multi-source data into comprehensive, structured bird profiles',
-    backstory="""You are a data scientist specializing in biological database integration with a focus on ornithology. 
-    Your expertise lies in combining diverse data sources into coherent, structured formats suitable for 
-    graph databases and relationship mapping. You understand Neo4j structures and scientific data standards.""",
-    verbose=True,
-    max_iter=1
-)
-
-def create_bird_analysis_crew(species_name: str, csv_metadata: dict) -> Crew:
-    """Create a specialized crew to analyze a single bird species"""
+    return result
+
+@lru_cache(maxsize=2048)
+def _analyze_all(wikipedia_text: str) -> dict:
+    """Habitat and behavior analysis of one text, sharing a single lowercased copy"""
+    text_lower = wikipedia_text.lower()
+    return {
+        'habitat': _habitat_analysis(text_lower),
+        'behavior': _behavior_analysis(text_lower)
+    }
+
+@tool
+def analyze_habitat_geography(wikipedia_text: str) -> str:
+    """Analyze habitat preferences and geographic distribution from Wikipedia text.
+    Returns JSON with habitats and geographic_regions arrays."""
+    return _dumps(_analyze_all(wikipedia_text)['habitat'])
+
+@tool
+def analyze_bird_behavior(wikipedia_text: str) -> str:
+    """Comprehensive analysis of bird behavioral patterns, physical traits, and ecological roles.
+    Returns detailed JSON with size, behaviors, feeding, social structure, migration, colors, and vocalizations."""
+    return _dumps(_analyze_all(wikipedia_text)['behavior'])
+
+# Define specialized agents. CrewAI mutates agents while a crew runs (crew, executor,
+# tools, prompt), so every worker thread gets its own set instead of sharing them
+def create_agents() -> Dict[str, Agent]:
+    """Build a fresh set of the five specialist agents"""
+    wikipedia_researcher = Agent(
+        role='Wikipedia Data Researcher',
+        goal='Efficiently fetch comprehensive Wikipedia data for bird species',
+        backstory="""You are an expert ornithological data collector with deep knowledge of Wikipedia's API structure. 
+        Your specialty is gathering reliable, comprehensive information about bird species from Wikipedia's vast database. 
+        You understand the nuances of scientific nomenclature and can navigate Wikipedia's data structure expertly.""",
+        tools=[fetch_wikipedia_data],
+        verbose=True,
+        max_iter=2
+    )
+
+    taxonomy_specialist = Agent(
+        role='Avian Taxonomy Expert',
+        goal='Extract accurate taxonomic classifications and scientific nomenclature',
+        backstory="""You are a world-renowned ornithological taxonomist with expertise in bird classification systems. 
+        You have spent decades studying phylogenetic relationships and can identify scientific names, family classifications, 
+        and taxonomic hierarchies with exceptional accuracy. Your knowledge spans both modern and historical nomenclature.""",
+        tools=[extract_taxonomy_info],
+        verbose=True,
+        max_iter=2
+    )
+
+    habitat_ecologist = Agent(
+        role='Habitat and Biogeography Specialist',
+        goal='Analyze habitat preferences and geographic distribution patterns',
+        backstory="""You are an ecological specialist focusing on avian biogeography and habitat analysis. 
+        Your expertise covers global ecosystems, migration corridors, and species distribution patterns. 
+        You excel at identifying environmental requirements and geographic ranges from descriptive texts.""",
+        tools=[analyze_habitat_geography],
+        verbose=True,
+        max_iter=2
+    )
+
+    behavioral_biologist = Agent(
+        role='Avian Behavioral Ecologist',
+        goal='Analyze comprehensive behavioral patterns and ecological roles',
+        backstory="""You are a leading behavioral ecologist specializing in avian behavior, feeding ecology, 
+        and social structures. Your research covers migration patterns, breeding behaviors, foraging strategies, 
+        and interspecies interactions. You can extract complex behavioral insights from observational data.""",
+        tools=[analyze_bird_behavior],
+        verbose=True,
+        max_iter=2
+    )
+
+    data_synthesizer = Agent(
+        role='Ornithological Data Integration Specialist',
+        goal='Synthesize multi-source data into comprehensive, structured bird profiles',
+        backstory="""You are a data scientist specializing in biological database integration with a focus on ornithology. 
+        Your expertise lies in combining diverse data sources into coherent, structured formats suitable for 
+        graph databases and relationship mapping. You understand Neo4j structures and scientific data standards.""",
+        verbose=True,
+        max_iter=1
+    )
+    
+    return {
+        'wikipedia_researcher': wikipedia_researcher,
+        'taxonomy_specialist': taxonomy_specialist,
+        'habitat_ecologist': habitat_ecologist,
+        'behavioral_biologist': behavioral_biologist,
+        'data_synthesizer': data_synthesizer
+    }
+
+_THREAD_STATE = threading.local()
+
+def _worker_agents() -> Dict[str, Agent]:
+    """This thread's agents, created on first use and reused for the species it processes next"""
+    if not hasattr(_THREAD_STATE, 'agents'):
+        _THREAD_STATE.agents = create_agents()
+    return _THREAD_STATE.agents
+
+def create_bird_analysis_crew(species_name: str, csv_metadata: dict, agents: Dict[str, Agent]) -> Crew:
+    """Create a specialized crew to analyze a single bird species with the given agents"""
+    
+    wikipedia_researcher = agents['wikipedia_researcher']
+    taxonomy_specialist = agents['taxonomy_specialist']
+    habitat_ecologist = agents['habitat_ecologist']
+    behavioral_biologist = agents['behavioral_biologist']
+    data_synthesizer = agents['data_synthesizer']
     
     # Task 1: Data Collection
     wikipedia_task = Task(
@@ -306,6 +561,8 @@ def create_bird_analysis_crew(species_name: str, csv_metadata: dict) -> Crew:
         tools=[fetch_wikipedia_data]
     )
     
+    # Tasks 2-4 only depend on the Wikipedia data, so they run concurrently (async_execution)
+    
     # Task 2: Taxonomic Analysis
     taxonomy_task = Task(
         description=f"""Extract taxonomic information for '{species_name}' from the Wikipedia data obtained by the researcher.
@@ -320,7 +577,8 @@ def create_bird_analysis_crew(species_name: str, csv_metadata: dict) -> Crew:
         expected_output="JSON containing scientific_name, family, and extraction success indicators",
         agent=taxonomy_specialist,
         context=[wikipedia_task],
-        tools=[extract_taxonomy_info]
+        tools=[extract_taxonomy_info],
+        async_execution=True
     )
     
     # Task 3: Habitat Analysis
@@ -337,7 +595,8 @@ def create_bird_analysis_crew(species_name: str, csv_metadata: dict) -> Crew:
         expected_output="JSON with comprehensive habitat arrays, geographic regions, and diversity metrics",
         agent=habitat_ecologist,
         context=[wikipedia_task],
-        tools=[analyze_habitat_geography]
+        tools=[analyze_habitat_geography],
+        async_execution=True
     )
     
     # Task 4: Behavioral Analysis
@@ -356,10 +615,11 @@ def create_bird_analysis_crew(species_name: str, csv_metadata: dict) -> Crew:
         expected_output="Comprehensive JSON with size, behaviors, feeding, social structure, migration, colors, and vocalizations",
         agent=behavioral_biologist,
         context=[wikipedia_task],
-        tools=[analyze_bird_behavior]
+        tools=[analyze_bird_behavior],
+        async_execution=True
     )
     
-    # Task 5: Data Synthesis
+    # Task 5: Data Synthesis (waits for all three analyses)
     synthesis_task = Task(
         description=f"""Synthesize all collected data for '{species_name}' into a comprehensive, structured bird profile ready for Neo4j integration.
         
@@ -381,107 +641,167 @@ def create_bird_analysis_crew(species_name: str, csv_metadata: dict) -> Crew:
     crew = Crew(
         agents=[wikipedia_researcher, taxonomy_specialist, habitat_ecologist, behavioral_biologist, data_synthesizer],
         tasks=[wikipedia_task, taxonomy_task, habitat_task, behavior_task, synthesis_task],
+        process=Process.sequential,
         verbose=True,
         planning=False  # Disable planning to avoid extra complexity
     )
     
     return crew
 
-def process_birds_with_crewai(csv_file: str = 'bird_images_summary.csv') -> Dict:
-    """Main function to process bird species using CrewAI"""
-    
-    # Read CSV file
-    df = pd.read_csv(csv_file)
+def run_for_species(species_name: str, csv_metadata: dict, agents: Optional[Dict[str, Agent]] = None):
+    """Analyze one species and return (crew output, seconds taken).
+    Uses the given agents, or this thread's own set; agents must not be shared between threads."""
+    crew = create_bird_analysis_crew(species_name, csv_metadata, agents or _worker_agents())
+    
+    # Reserve the crew's worst-case LLM calls up front so parallel workers stay under the provider's limit
+    _LLM_LIMIT.acquire(LLM_CALLS_PER_CREW)
+    start_time = time.time()
+    result = crew.kickoff()
+    return result, time.time() - start_time
+
+def _profile_key(species_name: str, csv_metadata: dict) -> str:
+    """Profile cache key: changes whenever the species or its CSV metadata change"""
+    payload = species_name.encode() + orjson.dumps(csv_metadata, option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(payload).hexdigest()
+
+def _process_one(species_name: str, csv_metadata: dict):
+    """Run the analysis crew for one species and return (species_name, profile, success)"""
     
-    print(f"🐦 Starting CrewAI Bird Analysis Pipeline")
-    print(f"📊 Processing {len(df)} bird species")
-    print("="*70)
+    cache_key = _profile_key(species_name, csv_metadata)
+    if USE_CACHE:
+        cached = _PROFILE_CACHE.get(cache_key)
+        if cached is not None:
+            with _PRINT_LOCK:
+                print(f"💾 CACHED: {species_name}")
+            return species_name, cached, True
     
-    bird_database = {}
-    successful_processing = 0
+    with _PRINT_LOCK:
+        print(f"\n🔄 PROCESSING: {species_name}")
     
-    for idx, row in df.iterrows():
-        species_name = row['species_name']
-        csv_metadata = {
-            'bird_id': row['bird_id'],
-            'image_count': row['image_count'],
-            'quality_score': row['quality_score'],
-            'file_size_mb': row['file_size_mb']
-        }
-        
-        print(f"\n🔄 PROCESSING ({idx+1}/{len(df)}): {species_name}")
-        print("="*70)
+    try:
+        # Execute the crew workflow
+        result, processing_time = run_for_species(species_name, csv_metadata)
         
+        # Parse and store the result
         try:
-            # Create specialized crew for this species
-            crew = create_bird_analysis_crew(species_name, csv_metadata)
+            # Extract the actual content from CrewOutput
+            if hasattr(result, 'raw'):
+                result_text = result.raw
+            else:
+                result_text = str(result)
             
-            # Execute the crew workflow
-            start_time = time.time()
-            result = crew.kickoff()
-            processing_time = time.time() - start_time
+            # Clean up markdown formatting if present
+            fence = _FENCE_RE.match(result_text)
+            bird_profile = orjson.loads(fence.group(1) if fence else result_text)
             
-            # Parse and store the result
-            # Parse and store the result
-            try:
-                # Extract the actual content from CrewOutput
-                if hasattr(result, 'raw'):
-                    result_text = result.raw
-                else:
-                    result_text = str(result)
-                
-                # Clean up markdown formatting if present
-                if result_text.startswith('```json'):
-                    result_text = result_text[7:-3].strip()
-                elif result_text.startswith('```'):
-                    result_text = result_text[3:-3].strip()
-                
-                bird_profile = json.loads(result_text)
-                
-                # Add processing metadata
-                bird_profile['processing_metadata'] = {
-                    'processing_time_seconds': round(processing_time, 2),
-                    'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
-                    'crew_agents': 5,
-                    'processing_success': True
-                }
-                
-                bird_database[species_name] = bird_profile
-                successful_processing += 1
-                
+            # Add processing metadata
+            bird_profile['processing_metadata'] = {
+                'processing_time_seconds': round(processing_time, 2),
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'crew_agents': 5,
+                'processing_success': True
+            }
+            
+            _PROFILE_CACHE.set(cache_key, bird_profile, expire=PROFILE_CACHE_TTL)
+            
+            with _PRINT_LOCK:
                 print(f"✅ SUCCESS: {species_name} processed in {processing_time:.2f}s")
-                
-            except (json.JSONDecodeError, AttributeError) as e:
-                print(f"⚠️  Parsing error for {species_name}: {e}")
-                bird_database[species_name] = {
-                    'species_name': species_name,
-                    'csv_metadata': csv_metadata,
-                    'error': f'Parsing failed: {str(e)}',
-                    'processing_success': False
-                }
+            return species_name, bird_profile, True
             
-        except Exception as e:
-            print(f"❌ ERROR processing {species_name}: {str(e)}")
-            bird_database[species_name] = {
+        except (orjson.JSONDecodeError, AttributeError) as e:
+            with _PRINT_LOCK:
+                print(f"⚠️  Parsing error for {species_name}: {e}")
+            return species_name, {
                 'species_name': species_name,
                 'csv_metadata': csv_metadata,
-                'error': str(e),
+                'error': f'Parsing failed: {str(e)}',
                 'processing_success': False
-            }
+            }, False
         
-        # Rate limiting and progress
-        time.sleep(1)  # Respectful rate limiting
-        print(f"📈 Progress: {idx+1}/{len(df)} species processed")
+    except Exception as e:
+        with _PRINT_LOCK:
+            print(f"❌ ERROR processing {species_name}: {str(e)}")
+        return species_name, {
+            'species_name': species_name,
+            'csv_metadata': csv_metadata,
+            'error': str(e),
+            'processing_success': False
+        }, False
+
+def _iter_jsonl(path: str):
+    """Yield (species_name, profile) from a results JSONL, skipping a truncated last line"""
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                yield from orjson.loads(line).items()
+            except orjson.JSONDecodeError:
+                continue
+
+def jsonl_to_dict(path: str = OUTPUT_JSONL) -> Dict:
+    """Load a results JSONL into one {species_name: profile} dict (later lines win)"""
+    return dict(_iter_jsonl(path))
+
+def _report_entry(bird_profile: dict) -> dict:
+    """The few fields generate_final_report needs, so full profiles don't stay in memory"""
+    return {
+        'processing_success': bird_profile.get('processing_metadata', {}).get('processing_success', False),
+        'scientific_name': bird_profile.get('scientific_name'),
+        'family': bird_profile.get('family'),
+        'habitats': bird_profile.get('habitats')
+    }
+
+def process_birds_with_crewai(csv_file: str = 'bird_images_summary.csv', output_file: str = OUTPUT_JSONL) -> Dict:
+    """Main function to process bird species using CrewAI; returns a per-species summary index"""
     
-    # Save comprehensive results
-    output_file = 'crewai_comprehensive_bird_database.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(bird_database, f, indent=2, ensure_ascii=False)
+    # Read CSV file
+    df = pd.read_csv(csv_file)
+    
+    print(f"🐦 Starting CrewAI Bird Analysis Pipeline")
+    print(f"📊 Processing {len(df)} bird species with {MAX_WORKERS} workers")
+    print("="*70)
+    
+    # Only the columns the crews need, converted to plain dicts in one pass
+    records = df[['species_name', *METADATA_COLUMNS]].to_dict('records')
+    args = [(rec['species_name'], {k: rec[k] for k in METADATA_COLUMNS}) for rec in records]
+    
+    # Resume: species already analysed successfully in a previous run are skipped
+    bird_index = {}
+    if os.path.exists(output_file):
+        species_in_csv = {species_name for species_name, _ in args}
+        for species_name, bird_profile in _iter_jsonl(output_file):
+            if species_name in species_in_csv:
+                bird_index[species_name] = _report_entry(bird_profile)
+        
+        # A crash mid-write can leave a partial last line; new records must start on a fresh one
+        with open(output_file, 'rb+') as f:
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+    
+    pending = [a for a in args if not bird_index.get(a[0], {}).get('processing_success')]
+    if len(pending) < len(args):
+        print(f"⏭️  Resuming: {len(args) - len(pending)} species already done")
+    
+    # One extracts call per 20 species instead of one REST call each
+    prefetch_wikipedia_summaries([species_name for species_name, _ in pending])
+    
+    # Species are independent, so run their crews side by side and append each profile as it lands
+    with open(output_file, 'ab') as f, ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        futures = [ex.submit(_process_one, *a) for a in pending]
+        for done, future in enumerate(as_completed(futures), 1):
+            species_name, bird_profile, success = future.result()
+            f.write(orjson.dumps({species_name: bird_profile}, option=orjson.OPT_NON_STR_KEYS) + b'\n')
+            f.flush()
+            bird_index[species_name] = _report_entry(bird_profile)
+            with _PRINT_LOCK:
+                print(f"📈 Progress: {done}/{len(pending)} species processed")
     
     # Generate final report
-    generate_final_report(bird_database, output_file, successful_processing, len(df))
+    successful_processing = sum(entry['processing_success'] for entry in bird_index.values())
+    generate_final_report(bird_index, output_file, successful_processing, len(df))
     
-    return bird_database
+    return bird_index
 
 def generate_final_report(bird_database: Dict, output_file: str, successful: int, total: int):
     """Generate comprehensive processing report"""
@@ -495,13 +815,17 @@ def generate_final_report(bird_database: Dict, output_file: str, successful: int
     print(f"❌ Failed extractions: {total - successful}")
     print(f"📈 Success rate: {(successful/total)*100:.1f}%")
     
-    # Quality metrics
-    scientific_names_found = sum(1 for data in bird_database.values() 
-                               if data.get('scientific_name') and data.get('scientific_name') != 'Unknown')
-    families_identified = sum(1 for data in bird_database.values() 
-                            if data.get('family') and data.get('family') != 'Unknown')
-    habitat_data_extracted = sum(1 for data in bird_database.values() 
-                               if data.get('habitats') and data.get('habitats') != ['unknown'])
+    # Quality metrics, one column-wise pass per field
+    report_df = pd.DataFrame.from_dict(bird_database, orient='index').reindex(columns=['scientific_name', 'family', 'habitats']).astype(object)
+    
+    def _filled(column):
+        """Rows with a non-empty value in column"""
+        return report_df[column].notna() & report_df[column].astype(bool)
+    
+    scientific_names_found = int((_filled('scientific_name') & (report_df['scientific_name'] != 'Unknown')).sum())
+    families_identified = int((_filled('family') & (report_df['family'] != 'Unknown')).sum())
+    only_unknown = (report_df['habitats'].str.len() == 1) & (report_df['habitats'].str[0] == 'unknown')
+    habitat_data_extracted = int((_filled('habitats') & ~only_unknown).sum())
     
     print(f"\n🔬 Data Quality Metrics:")
     print(f"   Scientific names extracted: {scientific_names_found}/{total} ({(scientific_names_found/total)*100:.1f}%)")
@@ -516,10 +840,15 @@ def generate_final_report(bird_database: Dict, output_file: str, successful: int
     print("   • Species ↔ Feeding types ↔ Food webs")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CrewAI bird analysis pipeline")
+    parser.add_argument('--no-cache', action='store_true', help="ignore cached Wikipedia summaries and species profiles")
+    cli_args = parser.parse_args()
+    USE_CACHE = not cli_args.no_cache
+    
     print("🚀 Initializing CrewAI Bird Analysis System...")
     
     # Process birds (start small for testing)
-    bird_database = process_birds_with_crewai('bird_images_summary.csv')
+    bird_index = process_birds_with_crewai('bird_images_summary.csv')
     
-    print(f"\n🎯 Analysis complete! Check 'crewai_comprehensive_bird_database.json' for results.")
+    print(f"\n🎯 Analysis complete! Check '{OUTPUT_JSONL}' for results (jsonl_to_dict loads it).")
     print("📋 Ready to proceed with Neo4j integration or further analysis.")
\ No newline at end of file